@@ -0,0 +1,208 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pedalboard
+import fx_config
+import fx_custom
+from audio_driver import FakeStreamDriver
+from audio_engine import PedalboardEngine
+from plugin_manager import PluginManager
+
+DEFAULT_BLOCK_SIZES = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
+DEFAULT_SAMPLE_RATES = [32000, 44100, 48000]
+
+def make_test_signal(sample_rate: int, seconds: float, seed: int = 0):
+    """
+    Deterministic guitar-like test signal: a 110 Hz harmonic tone re-plucked every 0.5 s,
+    on top of a quiet noise floor. Shape (samples, 2), float32.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    envelope = np.exp(-3.0 * (t % 0.5))
+    tone = sum(np.sin(2 * np.pi * 110 * k * t) / k for k in range(1, 6)) * envelope * 0.3
+    mono = (tone + rng.normal(0.0, 0.001, t.shape)).astype(np.float32)
+    return np.stack([mono, mono], axis=1)
+
+def get_targets(names=None) -> dict:
+    """
+    Every fx_config preset plus every fx_custom class (default params), as name -> chain config.
+    """
+    targets = {"default": fx_config.PLUGIN_CHAIN_CONFIG}
+    for key, (_label, config) in fx_config.PRESETS.items():
+        targets[key] = config
+    for name in sorted(fx_custom.list_effects()):
+        targets[name] = [{"type": "custom", "name": name}]
+
+    if names:
+        targets = {name: config for name, config in targets.items() if name in names}
+    return targets
+
+def measure_allocations(callback, block_size: int, blocks: int = 200) -> float:
+    """
+    Average peak memory (bytes) allocated while the callback processes one block, via tracemalloc.
+    NumPy reports its buffers to tracemalloc, so temporary arrays show up here.
+    """
+    rng = np.random.default_rng(1)
+    indata = (rng.standard_normal((block_size, 2)) * 0.1).astype(np.float32)
+    outdata = np.zeros_like(indata)
+
+    # Warm up first so one-time buffer allocations are not counted
+    for _ in range(8):
+        callback(indata, outdata, block_size, None, None)
+
+    tracemalloc.start()
+    total = 0
+    for _ in range(blocks):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        callback(indata, outdata, block_size, None, None)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / blocks
+
+def bench_target(name: str, plugin_config: list, block_sizes: list, sample_rates: list, seconds: float) -> list:
+    print(f"\n⏱️  Benchmarking {name}...")
+    chain = PluginManager.load_effect_chain(plugin_config)
+    if len(chain) < len(plugin_config):
+        # Timing what is left would report numbers for a chain that does not exist
+        print(f"   ⚠️ {len(plugin_config) - len(chain)} effect(s) failed to load, skipping {name}")
+        return []
+    rows = []
+
+    for sample_rate in sample_rates:
+        signal = make_test_signal(sample_rate, seconds)
+        for block_size in block_sizes:
+            engine = PedalboardEngine(plugin_chain=chain, sample_rate=sample_rate, block_size=block_size)
+            engine.compiled_chain.reset()
+            driver = FakeStreamDriver(engine._audio_callback, block_size) # pylint: disable=protected-access
+
+            start_time = time.perf_counter()
+            driver.run(signal)
+            elapsed = time.perf_counter() - start_time
+
+            block_us = driver.block_times_ns / 1000.0
+            deadline_us = block_size / sample_rate * 1e6
+            failed_blocks = engine.dsp_errors
+            if failed_blocks:
+                # The failsafe passed these blocks through dry: their timing says nothing about the chain
+                rows.append({"target": name, "sample_rate": sample_rate, "block_size": block_size,
+                             "realtime_factor": None, "deadline_us": deadline_us, "p50_us": None, "p99_us": None,
+                             "max_us": None, "deadline_misses": None, "alloc_bytes_per_block": None,
+                             "failed_blocks": failed_blocks})
+                print(f"   {sample_rate:>6} Hz  block {block_size:>5}: ❌ FAILED, "
+                      f"{failed_blocks}/{len(block_us)} blocks raised a DSP error")
+                continue
+            row = {
+                "target": name,
+                "sample_rate": sample_rate,
+                "block_size": block_size,
+                "realtime_factor": (len(block_us) * block_size / sample_rate) / elapsed,
+                "deadline_us": deadline_us,
+                "p50_us": float(np.percentile(block_us, 50)),
+                "p99_us": float(np.percentile(block_us, 99)),
+                "max_us": float(block_us.max()),
+                "deadline_misses": int(np.count_nonzero(block_us > deadline_us)),
+                "alloc_bytes_per_block": measure_allocations(
+                    engine._audio_callback, block_size), # pylint: disable=protected-access
+                "failed_blocks": 0,
+            }
+            rows.append(row)
+            print(f"   {sample_rate:>6} Hz  block {block_size:>5}: {row['realtime_factor']:8.1f}x realtime, "
+                  f"p99 {row['p99_us']:8.1f} µs / {deadline_us:8.1f} µs, "
+                  f"{row['alloc_bytes_per_block']:8.0f} B alloc/block")
+    return rows
+
+def get_metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pedalboard": pedalboard.__version__,
+        "machine": platform.machine(),
+    }
+
+def write_results(path: str, rows: list):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"meta": get_metadata(), "results": rows}, f, indent=2)
+    print(f"\n💾 Results written to {path}")
+
+def load_results(path: str) -> list:
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return [{k: (v if k == "target" else float(v) if v != "" else None) for k, v in row.items()}
+                    for row in csv.DictReader(f)]
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+def compare_results(baseline_path: str, rows: list, threshold: float = 0.10):
+    """
+    Prints the realtime-factor ratio against a previous run and flags regressions beyond `threshold`.
+    """
+    baseline = {(r["target"], int(r["sample_rate"]), int(r["block_size"])): r for r in load_results(baseline_path)}
+    print(f"\n📈 Compared with {baseline_path}:")
+    regressions = 0
+    for row in rows:
+        old = baseline.get((row["target"], row["sample_rate"], row["block_size"]))
+        if not old:
+            continue
+        if row["realtime_factor"] is None or old.get("realtime_factor") is None:
+            # Failed rows have no speed to compare; a row that used to run and now fails is a regression
+            if row["realtime_factor"] is None and old.get("realtime_factor") is not None:
+                regressions += 1
+                print(f"   {row['target']:<12} {row['sample_rate']:>6} Hz  block {row['block_size']:>5}:  failed  ❌ regression")
+            continue
+        ratio = row["realtime_factor"] / old["realtime_factor"]
+        flag = ""
+        if ratio < 1.0 - threshold:
+            flag = "  ❌ regression"
+            regressions += 1
+        print(f"   {row['target']:<12} {row['sample_rate']:>6} Hz  block {row['block_size']:>5}: {ratio:6.2f}x speed{flag}")
+    print(f"   {regressions} regressions beyond {threshold:.0%}")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Headless benchmark for effect chains and custom effects")
+    parser.add_argument("-t", "--targets", nargs="*", help="Presets (a1, default...) or fx_custom class names (default: all)")
+    parser.add_argument("-b", "--block-sizes", nargs="*", type=int, default=DEFAULT_BLOCK_SIZES)
+    parser.add_argument("-r", "--sample-rates", nargs="*", type=int, default=DEFAULT_SAMPLE_RATES)
+    parser.add_argument("-s", "--seconds", type=float, default=2.0, help="Length of the synthetic test signal")
+    parser.add_argument("-o", "--out", type=str, default=None, help="Results file (.json or .csv)")
+    parser.add_argument("-c", "--compare", type=str, default=None, help="Previous results file to compare against")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    rows = []
+    for name, config in get_targets(args.targets).items():
+        rows += bench_target(name, config, args.block_sizes, args.sample_rates, args.seconds)
+
+    if not rows:
+        print("⚠️ Nothing to benchmark.")
+        return
+
+    out_path = args.out or os.path.join("output", f"bench-{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    write_results(out_path, rows)
+    if args.compare:
+        compare_results(args.compare, rows)
+
+if __name__ == "__main__":
+    main()
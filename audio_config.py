@@ -1,8 +1,33 @@
-import sounddevice as sd
+try:
+    import sounddevice as sd
+except OSError:
+    # PortAudio is not installed (e.g. headless CI): offline tools still work
+    sd = None
 
 SAMPLE_RATE = 32000
 BLOCK_SIZE = 32
 LATENCY = (0.01, 0.01) # (input, output) ms
+CROSSFADE_MS = 30 # Equal-power crossfade length when switching presets live
+PARAM_SMOOTHING_MS = 20 # Glide time for automated parameter changes
+ISOLATION_LOOKAHEAD_BLOCKS = 2 # Extra blocks of latency given to the isolated DSP worker (--isolate)
+
+# Auto-tuning (--auto-tune / --adaptive)
+AUTO_TUNE_BLOCK_SIZES = (16, 32, 64, 128, 256, 512, 1024) # Candidates, smallest first
+AUTO_TUNE_HEADROOM = 0.5 # Fraction of each block deadline that must stay free (p99 callback cost)
+XRUN_LIMIT = 3 # xruns within XRUN_WINDOW_S that make --adaptive restart with a larger block
+XRUN_WINDOW_S = 2.0
+
+# Idle bypass (--idle-bypass)
+IDLE_THRESHOLD_DB = -60.0 # Block RMS (dBFS) above which the input counts as playing
+IDLE_HYSTERESIS_DB = 6.0 # The input only counts as silent again this far below the threshold
+IDLE_HOLD_S = 0.5 # Silence kept processing, on top of the chain's effect tails, before blocks are skipped
+
+# Backing track (--backing)
+BACKING_GAIN_DB = -6.0 # Level of the backing track in the output, relative to the guitar
+BACKING_RING_S = 2.0 # Audio the reader thread keeps queued ahead of the callback
+
+# Realtime debug checks (--debug-rt)
+DEBUG_ALLOC_LIMIT_BYTES = 4096 # Per stage and block; NumPy views and scalars stay well below this
 
 # Device Selection
 # Use `python3 -m sounddevice` to list available devices by ID
@@ -10,5 +35,6 @@ INPUT_DEVICE = 1 # e.g. Spark 2 USB Audio
 OUTPUT_DEVICE = 5 # e.g. MacBook Pro Speakers
 
 # Apply global settings if imported
-sd.default.device = (INPUT_DEVICE, OUTPUT_DEVICE)
-sd.default.latency = LATENCY
+if sd:
+    sd.default.device = (INPUT_DEVICE, OUTPUT_DEVICE)
+    sd.default.latency = LATENCY
@@ -0,0 +1,89 @@
+import threading
+import time
+import numpy as np
+
+class FakeStreamDriver:
+    """
+    Stands in for sd.Stream without an audio device: feeds a signal block by block into an
+    audio callback with the same (indata, outdata, frames, time, status) signature that
+    sounddevice uses, and collects the output.
+    """
+    def __init__(self, callback, block_size: int, channels=2):
+        self.callback = callback
+        self.block_size = block_size
+        # A channel count or an (input, output) pair, like sd.Stream
+        self.input_channels, self.output_channels = channels if isinstance(channels, tuple) else (channels, channels)
+        self.block_times_ns = None # Wall time of every callback from the last run()
+
+    def run(self, signal):
+        """
+        Drives the callback over `signal` (samples, input channels). Trailing samples that do not fill
+        a whole block are dropped, like a device would only ever hand out full blocks.
+        """
+        num_blocks = signal.shape[0] // self.block_size
+        output = np.zeros((num_blocks * self.block_size, self.output_channels), dtype=np.float32)
+        indata = np.zeros((self.block_size, self.input_channels), dtype=np.float32)
+        outdata = np.zeros((self.block_size, self.output_channels), dtype=np.float32)
+        self.block_times_ns = np.zeros(num_blocks, dtype=np.int64)
+
+        for index in range(num_blocks):
+            start = index * self.block_size
+            indata[:] = signal[start:start + self.block_size]
+
+            block_start = time.perf_counter_ns()
+            self.callback(indata, outdata, self.block_size, None, None)
+            self.block_times_ns[index] = time.perf_counter_ns() - block_start
+
+            output[start:start + self.block_size] = outdata
+
+        return output
+
+class LoopbackStream:
+    """
+    Software stand-in for sd.Stream with every output channel wired back to the same input channel,
+    like a cable from output to input. Takes sd.Stream's arguments, so the engine opens it through
+    the same code path as a device.
+
+    A sample written by the callback comes back (latency in + latency out) * samplerate + blocksize
+    samples later, the round trip the engine reports for a real device. The callback runs on its own
+    thread, as fast as it can (realtime=True paces it like a device).
+    """
+    def __init__(self, device=None, channels=2, callback=None, samplerate=None, blocksize=None,
+                 latency=(0.01, 0.01), realtime: bool = False):
+        self.callback = callback
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.latency = tuple(latency)
+        self.realtime = realtime
+        self.input_channels, self.output_channels = channels if isinstance(channels, tuple) else (channels, channels)
+        # FIFO of exactly `delay` samples, oldest first: every block read from its head was appended
+        # `delay` samples earlier (at least one block, as a callback never hears its own output)
+        delay = int(round(sum(self.latency) * samplerate)) + blocksize
+        self._line = np.zeros((delay, self.output_channels), dtype=np.float32)
+        self._running = False
+        self._thread = None
+
+    def _loop(self):
+        indata = np.zeros((self.blocksize, self.input_channels), dtype=np.float32)
+        outdata = np.zeros((self.blocksize, self.output_channels), dtype=np.float32)
+        looped = min(self.input_channels, self.output_channels)
+        block_s = self.blocksize / self.samplerate
+        next_time = time.perf_counter()
+        while self._running:
+            indata[:, :looped] = self._line[:self.blocksize, :looped]
+            self.callback(indata, outdata, self.blocksize, None, None)
+            self._line[:-self.blocksize] = self._line[self.blocksize:]
+            self._line[-self.blocksize:] = outdata
+            if self.realtime:
+                next_time += block_s
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def __enter__(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="loopback-stream")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self._running = False
+        self._thread.join()
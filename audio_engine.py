@@ -1,26 +1,288 @@
-from datetime import datetime
-import sounddevice as sd
+import queue
+import threading
+import time
+import numpy as np
 import audio_config
-
-# We import these for type checking compatibility if needed,
-# but mostly we just iterate the chain.
+from audio_config import sd
+from audio_driver import LoopbackStream
+from audio_latency import LatencyMeter
+from audio_profiler import CallbackProfiler
+from audio_tuner import BlockSizeTuner
+from chain_compiler import ChainCompiler
+from dsp_worker import IsolatedChain
+from mod_activity import ActivityDetector
+from mod_buffer_arena import BufferArena, RealtimeGuard
+from mod_automation import ParameterAutomation
+from mod_aud_rec import take_timestamp
 
 class PedalboardEngine:
     """
     Manages the realtime audio stream, effect processing loop, and recording.
     """
-    def __init__(self, clean_recorder=None, fx_recorder=None, plugin_chain=None):
+    def __init__(self, clean_recorder=None, fx_recorder=None, plugin_chain=None, profile=False,
+                 sample_rate=None, block_size=None, preset_bank=None, preset=None, isolate=False,
+                 auto_tune=False, adaptive=False, idle_bypass=False, recorder=None,
+                 debug_realtime=False, router=None, loopback=False, backing=None):
         self.clean_recorder = clean_recorder
         self.fx_recorder = fx_recorder
-        self.chain = plugin_chain if plugin_chain else []
+        self.recorder = recorder # Combined clean + fx recorder (one aligned multichannel file)
+        self.backing = backing # BackingTrack mixed into the output after the chain
+        self._take_timestamp = None # Shared by every recorder of the current take, set in run()
+        self.sample_rate = sample_rate or audio_config.SAMPLE_RATE
+        self.block_size = block_size or audio_config.BLOCK_SIZE
+        self.latency = audio_config.LATENCY
+        # The audio device, or a software loopback (output wired to input) standing in for it
+        self.stream_class = LoopbackStream if loopback else (sd.Stream if sd else None)
+        self.profiler = CallbackProfiler(self.block_size, self.sample_rate) if profile else None
+        self.arena = None # Preallocated float32 blocks for the engine and the chain stages, see _set_block_size()
+
+        # Debug assertion mode: every stage is checked for allocations and dtype conversions
+        self.guard = None
+        if debug_realtime and isolate:
+            print("⚠️ Realtime debug checks are not available with --isolate (the chain runs in the worker)")
+        elif debug_realtime:
+            self.guard = RealtimeGuard(audio_config.DEBUG_ALLOC_LIMIT_BYTES)
+
+        # Block size tuning: measured at startup (auto_tune) and/or raised on xruns (adaptive)
+        self.auto_tune = auto_tune
+        self.adaptive = adaptive
+        self.xruns = 0
+        self.dsp_errors = 0 # Blocks the failsafe played dry (or silent) after the chain raised
+        self._xrun_window = (0.0, 0) # (start time, xrun count at start)
+
+        # Idle bypass: skip the chain while the input is silent and all effect tails have decayed
+        self.activity = None
+        if idle_bypass and isolate:
+            print("⚠️ Idle bypass is not available with --isolate (the worker's effect tails are unknown)")
+        elif idle_bypass:
+            self.activity = ActivityDetector(self.sample_rate, audio_config.IDLE_THRESHOLD_DB,
+                                             audio_config.IDLE_HYSTERESIS_DB, audio_config.IDLE_HOLD_S)
+
+        # Live preset switching: chains come from (and stay cached in) the bank
+        self.preset_bank = preset_bank
+        self.preset = preset
+        self.isolated_chain = None
+        if router is not None:
+            # Multi-input: one chain per input, mixed to the outputs. Presets apply to a single
+            # chain, so live switching is not available.
+            compiled_chain = router
+            self.preset_bank = None
+        elif isolate:
+            # The chain runs in a worker process built from the preset config.
+            # Its effects are not in this process, so live switching is not available.
+            plugin_config = preset_bank.presets[preset][1] if preset_bank and preset else []
+            compiled_chain = IsolatedChain(plugin_config, self.sample_rate, self.block_size,
+                                           lookahead=audio_config.ISOLATION_LOOKAHEAD_BLOCKS, name=preset)
+            self.isolated_chain = compiled_chain
+            self.preset_bank = None
+        elif preset_bank and preset:
+            compiled_chain = preset_bank.get(preset)
+        else:
+            # Resolve effect layouts and native groups once, not on every block.
+            # When profiling, every effect gets its own stage so it can be timed on its own.
+            compiled_chain = ChainCompiler.compile(plugin_chain if plugin_chain else [], group_native=not profile)
+        self.chain = compiled_chain.effects
+        self.compiled_chain = self._prepare_chain(compiled_chain)
+        self.input_channels = getattr(compiled_chain, "input_channels", 2)
+        self.output_channels = getattr(compiled_chain, "output_channels", 2)
+
+        # Crossfade state. The callback picks up _pending_chain at a block boundary;
+        # _fading_chain is the previous chain while it fades out.
+        self._pending_chain = None
+        self._pending_crossfade = True
+        self._fading_chain = None
+        self._fade_pos = 0
+        self._idle = False # The idle bypass skipped the last block (its output faded out)
+        self._set_block_size(self.block_size)
+
+        # Parameter changes from other threads, drained at the start of each block
+        self.automation = ParameterAutomation(self.sample_rate, audio_config.PARAM_SMOOTHING_MS)
+
+    def _set_block_size(self, block_size: int):
+        """
+        (Re)allocates everything sized by the block: buffer arena (and the chains bound to it),
+        crossfade ramps, mix buffers, profiler deadline. Only call while no stream is running.
+        """
+        self.block_size = block_size
+        self.arena = BufferArena(block_size, channels=self.output_channels, sample_rate=self.sample_rate)
+        for chain in [self.compiled_chain] + (self.preset_bank.loaded() if self.preset_bank else []):
+            self._bind(chain)
+        fade_len = max(1, int(self.sample_rate * audio_config.CROSSFADE_MS / 1000))
+        fade_len = -(-fade_len // self.block_size) * self.block_size # Whole blocks
+        ramp = (np.arange(fade_len, dtype=np.float32) + 0.5) / fade_len * (np.pi / 2)
+        self._fade_in = np.sin(ramp)[:, np.newaxis]
+        self._fade_out = np.cos(ramp)[:, np.newaxis]
+        # One-block ramps for entering and leaving the idle bypass
+        idle_ramp = ((np.arange(block_size, dtype=np.float32) + 0.5) / block_size)[:, np.newaxis]
+        self._idle_fade_in = idle_ramp
+        self._idle_fade_out = np.ascontiguousarray(idle_ramp[::-1])
+        self._mix_buffer = self.arena.block("mix")
+        self._fade_buffer = self.arena.block("fade")
+        self._silence = self.arena.block("silence")
+        if self.profiler:
+            self.profiler.set_block_size(block_size, self.sample_rate)
+
+    def _bind(self, compiled_chain):
+        # Isolated chains keep their buffers in the worker process
+        if self.arena and hasattr(compiled_chain, "bind"):
+            compiled_chain.bind(self.arena)
+
+    def _prepare_chain(self, compiled_chain):
+        self._bind(compiled_chain)
+        if self.activity:
+            # Computed here, off the audio thread, rather than by the callback when the input goes quiet
+            self.activity.set_tail(compiled_chain.effects)
+        if self.profiler and compiled_chain.profile_indices is None:
+            compiled_chain.profile_indices = self.profiler.register_stages(compiled_chain.stage_labels())
+        return compiled_chain
+
+    def switch_chain(self, compiled_chain, crossfade: bool = True):
+        """
+        Queues a compiled chain to replace the running one at the next block boundary,
+        with an equal-power crossfade. Call from any thread except the audio thread:
+        the callback only picks up the new pointer, it never allocates or locks.
+        With crossfade=False the chain is swapped in hard and not reset: used when it shares
+        effects (and their running state) with the current chain, which must not run twice per block.
+        """
+        if compiled_chain is self.compiled_chain:
+            return
+        # Start from clean state (stale tails from the last time this chain played),
+        # unless it is still fading out and therefore running on the audio thread
+        if crossfade and compiled_chain is not self._fading_chain:
+            compiled_chain.reset()
+        self.chain = compiled_chain.effects
+        self._pending_crossfade = crossfade
+        self._pending_chain = self._prepare_chain(compiled_chain)
+
+    def switch_preset(self, key: str):
+        """
+        Switches to a preset from the bank, loading it first if it is not cached yet.
+        """
+        if not self.preset_bank or key not in self.preset_bank:
+            print(f"⚠️ Unknown preset: {key}")
+            return
+        self.switch_chain(self.preset_bank.get(key))
+        self.preset = key
+        print(f"🎚️  Switched to preset: {self.preset_bank.label(key)}")
+
+    def reload_presets(self, presets: dict):
+        """
+        Applies edited preset configs while the stream runs (ConfigWatcher callback, --watch).
+        New plugins are loaded on the calling thread; changed params of kept effects go through
+        the automation queue (and glide), and a recompiled running chain is swapped in at the next block.
+        """
+        if not self.preset_bank:
+            print("⚠️ Config reload is not available with --isolate or --routing")
+            return
+        rebuilt, changes = self.preset_bank.reload(presets)
+        for effect, name, value in changes:
+            self.automation.push(effect, name, value)
+        for key, chain in rebuilt.items():
+            if key == self.preset:
+                # Kept effects carry their state (reverb tails, delay lines) over without a crossfade
+                self.switch_chain(chain, crossfade=False)
+            else:
+                self._bind(chain)
+
+    def set_parameter(self, effect, name: str, value, smooth: bool = True):
+        """
+        Changes an effect parameter while the stream runs. Safe to call from any thread:
+        the change is queued and applied by the callback at the next block boundary,
+        gliding over PARAM_SMOOTHING_MS for numeric values unless smooth is False.
+        `effect` is an index into the running chain or an effect class name. Unknown parameter names
+        and values that do not convert to the parameter's type are rejected before anything is queued.
+        """
+        if isinstance(effect, str):
+            # Wrapped effects (e.g. oversampled stages) match by the class they wrap
+            matches = [e for e in self.chain if type(getattr(e, "effect", e)).__name__ == effect]
+            if not matches:
+                print(f"⚠️ No effect named {effect} in the running chain")
+                return
+            target = matches[0]
+        else:
+            target = self.chain[effect]
+
+        # Checked here, on the calling thread: a bad name or value must not reach the audio callback
+        if name.startswith("_") or not hasattr(target, name):
+            print(f"⚠️ {type(getattr(target, 'effect', target)).__name__} has no parameter '{name}'")
+            return
+        current = getattr(target, name)
+        try:
+            if isinstance(current, bool) and isinstance(value, str):
+                value = {"true": True, "on": True, "1": True, "false": False, "off": False, "0": False}[value.lower()]
+            elif isinstance(current, bool):
+                value = bool(value)
+            elif isinstance(current, (int, float)):
+                value = float(value)
+        except (KeyError, ValueError, TypeError):
+            print(f"⚠️ Invalid value for '{name}': {value!r} (expected {type(current).__name__})")
+            return
+        self.automation.push(target, name, value, smooth)
+
+    def _process(self, chain, signal):
+        if self.profiler:
+            return chain.process_profiled(signal, self.sample_rate, self.profiler)
+        if self.guard:
+            return chain.process_checked(signal, self.sample_rate, self.guard)
+        return chain.process(signal, self.sample_rate)
+
+    def _process_crossfade(self, signal):
+        """
+        Runs both the incoming and the outgoing chain and mixes them with equal-power gains.
+        """
+        frames = signal.shape[0]
+        fade_in = self._fade_in[self._fade_pos:self._fade_pos + frames]
+        fade_out = self._fade_out[self._fade_pos:self._fade_pos + frames]
+        mixed = self._mix_buffer[:frames]
+        faded = self._fade_buffer[:frames]
+
+        np.multiply(self._process(self.compiled_chain, signal), fade_in, out=mixed)
+        np.multiply(self._process(self._fading_chain, signal), fade_out, out=faded)
+        mixed += faded
+
+        self._fade_pos += frames
+        if self._fade_pos >= self._fade_in.shape[0]:
+            self._fading_chain = None
+        return mixed
+
+    def _enter_idle(self, signal):
+        """
+        A block skipped by the idle bypass. The first one still runs the chain and fades it out over
+        the block, so a high-gain chain's amplified noise floor does not stop with a click.
+        """
+        frames = signal.shape[0]
+        if self._idle:
+            return self._silence[:frames]
+        self._idle = True
+        out = self._mix_buffer[:frames]
+        np.multiply(self._process(self.compiled_chain, signal), self._idle_fade_out[:frames], out=out)
+        return out
+
+    def _leave_idle(self, processed):
+        # First block after the bypass: fade the chain's output back in over the block
+        self._idle = False
+        frames = processed.shape[0]
+        out = self._mix_buffer[:frames]
+        np.multiply(processed, self._idle_fade_in[:frames], out=out)
+        return out
 
     def _audio_callback(self, indata, outdata, _frames, _time, status):
         """
         Realtime audio callback called by sounddevice.
         """
-        if status:
+        if status and (status.output_underflow or status.input_overflow):
+            self.xruns += 1 # Watched by the command loop when adapting the block size
+
+        if self.profiler:
+            callback_start = time.perf_counter_ns()
+            # Counted instead of printed: the callback thread must not block on I/O
+            self.profiler.record_status(status)
+        elif status:
             print(f"⚠️ Audio Status: {status}")
 
+        if self.guard:
+            self.guard.check_input(indata)
+
         # 1. Record Clean Input
         if self.clean_recorder:
             self.clean_recorder.add_frame(indata)
@@ -29,22 +291,43 @@ class PedalboardEngine:
         # We start with the input signal
         current_signal = indata
 
+        # Pick up a queued preset switch at the block boundary
+        pending = self._pending_chain
+        if pending is not None:
+            self._pending_chain = None
+            self._fading_chain = self.compiled_chain if self._pending_crossfade else None
+            self.compiled_chain = pending
+            self._fade_pos = 0
+            if self.guard:
+                self.guard.warmup() # A newly switched-in chain may still set itself up
+
         try:
-            for effect in self.chain:
-                # Efficient logic to determine how to call the effect
-                if hasattr(effect, '__class__') and effect.__class__.__module__.startswith('fx_custom'):
-                     # Custom Python effects expect (samples, channels)
-                    current_signal = effect(current_signal, audio_config.SAMPLE_RATE)
-                else:
-                    # Standard Pedalboard (C++) effects expect (channels, samples)
-                    # We transpose before and after
-                    current_signal = effect(current_signal.T, sample_rate=audio_config.SAMPLE_RATE).T
+            # Apply queued parameter changes and advance parameter glides
+            self.automation.process_block(current_signal.shape[0])
+
+            if self._fading_chain is not None and self._fading_chain is not self.compiled_chain:
+                current_signal = self._process_crossfade(current_signal)
+                if self._idle:
+                    current_signal = self._leave_idle(current_signal)
+            elif self.activity and self.activity.update(current_signal):
+                # Silent input, tails decayed: the chain would only output silence (or amplified noise)
+                current_signal = self._enter_idle(current_signal)
+            else:
+                self._fading_chain = None
+                current_signal = self._process(self.compiled_chain, current_signal)
+                if self._idle:
+                    current_signal = self._leave_idle(current_signal)
 
         except (ValueError, RuntimeError, TypeError) as e:
             # Failsafe: If DSP crashes, we don't want to crash the thread if possible,
             # or allow it to pass through dry signal.
             # Printing ensures we see the error.
             print(f"❌ DSP Error: {e}")
+            self.dsp_errors += 1
+            current_signal = indata
+            if indata.shape[1] != self.output_channels:
+                # Multi-input routing: the dry inputs do not map onto the outputs, play silence instead
+                current_signal = self._silence[:indata.shape[0]]
 
         # 3. Write processed audio to output
         outdata[:] = current_signal
@@ -52,55 +335,271 @@ class PedalboardEngine:
         # 4. Record FX Output
         if self.fx_recorder:
             self.fx_recorder.add_frame(outdata)
+        if self.recorder:
+            self.recorder.add_frames(indata, outdata)
+
+        # 5. Mix in the backing track: after the chain, and after recording so recordings stay guitar only
+        if self.backing:
+            self.backing.mix_into(outdata)
+
+        if self.guard:
+            self.guard.end_block()
+        if self.profiler:
+            self.profiler.record_callback(time.perf_counter_ns() - callback_start)
+
+    def open_stream(self, callback):
+        """
+        The duplex stream used by run() and the latency meter, with the engine's current
+        block size, latency and channel counts.
+        """
+        return self.stream_class(
+            device=(audio_config.INPUT_DEVICE, audio_config.OUTPUT_DEVICE),
+            channels=(self.input_channels, self.output_channels),
+            callback=callback,
+            samplerate=self.sample_rate,
+            blocksize=self.block_size,
+            latency=self.latency
+        )
+
+    def _check_tuning(self):
+        if self.isolated_chain and (self.auto_tune or self.adaptive):
+            print("⚠️ Block size tuning is not available with --isolate (the worker's buffers are fixed)")
+            self.auto_tune = self.adaptive = False
+        if self.auto_tune:
+            self._auto_tune()
+
+    def measure_latency(self) -> dict:
+        """
+        Measures the device round trip through open_stream() and the chain's algorithmic latency
+        (--measure-latency), prints the report and returns the measurements.
+        """
+        if self.stream_class is None:
+            print("❌ PortAudio library not found: use --loopback to measure against a software loopback.")
+            return None
+        self._check_tuning()
+        print(f"\n📏 Measuring latency ({'software loopback' if self.stream_class is LoopbackStream else 'output 1 -> input 1'})...")
+        meter = LatencyMeter(self.sample_rate)
+        try:
+            if self.isolated_chain:
+                self.isolated_chain.start() # Measured under the same load as when playing
+            result = meter.measure(self)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"❌ Latency measurement failed: {e}")
+            print("   Tip: Check your device IDs in audio_config.py and the output 1 -> input 1 loop")
+            return None
+        finally:
+            if self.isolated_chain:
+                self.isolated_chain.stop()
+        print(meter.report(result))
+        return result
 
     def run(self):
         """
         Starts the blocking audio stream.
         """
+        if self.stream_class is None:
+            print("❌ PortAudio library not found: live audio is unavailable (offline tools still work).")
+            return
+
+        self._check_tuning()
+
         print("\n🎛️  Initializing Audio Engine...")
         print(f"   Input Device ID: {audio_config.INPUT_DEVICE}")
         print(f"   Output Device ID: {audio_config.OUTPUT_DEVICE}")
-        print(f"   Sample Rate: {audio_config.SAMPLE_RATE} Hz")
-        print(f"   Block Size: {audio_config.BLOCK_SIZE}")
+        print(f"   Sample Rate: {self.sample_rate} Hz")
+        print(f"   Block Size: {self.block_size}")
 
         # Helpful info for user
         # print("   Available Devices:")
         # print(sd.query_devices())
 
+        # Commands are read on their own thread so the loop below can also react to xruns
+        commands = queue.Queue()
+        threading.Thread(target=self._read_commands, args=(commands,), daemon=True).start()
+
+        # One timestamp per take, so the -clean and -fx files of a take share their name
+        self._take_timestamp = take_timestamp()
         try:
+            if self.isolated_chain:
+                self.isolated_chain.start()
             if self.clean_recorder:
-                self.clean_recorder.start()
+                self.clean_recorder.start(self._take_timestamp)
             if self.fx_recorder:
-                self.fx_recorder.start()
-
-            # Start the stream
-            # We use settings from audio_config directly
-            with sd.Stream(
-                device=(audio_config.INPUT_DEVICE, audio_config.OUTPUT_DEVICE),
-                channels=2,
-                callback=self._audio_callback,
-                samplerate=audio_config.SAMPLE_RATE,
-                blocksize=audio_config.BLOCK_SIZE
-                # latency is handled by sd.default.latency which we set in audio_config
-            ):
-                print("\n🚀 Pedalboard Running! Press 'Enter' to stop...")
-                input()
+                self.fx_recorder.start(self._take_timestamp)
+            if self.recorder:
+                self.recorder.start(self._take_timestamp)
+            if self.backing:
+                self.backing.start()
+
+            restart = True
+            announced = False
+            while restart:
+                # Start the stream
+                # We use settings from audio_config directly (block size and latency may be tuned)
+                with self.open_stream(self._audio_callback) as stream:
+                    self._report_latency(stream)
+                    if not announced:
+                        announced = True
+                        print("\n🚀 Pedalboard Running! Press 'Enter' to stop...")
+                        if self.preset_bank:
+                            print(f"   Type a preset key + 'Enter' to switch live: {', '.join(self.preset_bank.presets)}")
+                        print("   Type 'set <effect #|name> <param> <value>' + 'Enter' to change a parameter")
+                        if self.backing:
+                            print("   Type 'seek <seconds>' + 'Enter' to move the backing track")
+                        if self.profiler or self.activity:
+                            print("   Type 'stats' + 'Enter' for a callback profile / idle bypass counters")
+                    restart = self._command_loop(commands)
+                if restart:
+                    self._step_up_block_size()
 
         except (OSError, ValueError) as e:
             print(f"\n❌ Audio Engine Error: {e}")
             print("   Tip: Check your device IDs in audio_config.py")
         finally:
+            if self.isolated_chain:
+                self.isolated_chain.stop()
+            if self.backing:
+                self.backing.stop()
+                print(self.backing.report())
+            if self.profiler:
+                print("\n" + self.profiler.report())
+            if self.activity:
+                print(self.activity.report())
             self._save_recordings()
 
+    def _auto_tune(self):
+        """
+        Measures the chain with synthetic input and picks the smallest block size and latency
+        that keep AUTO_TUNE_HEADROOM of every block free.
+        """
+        print(f"\n🔧 Auto-tuning block size (headroom {audio_config.AUTO_TUNE_HEADROOM * 100:.0f}%)...")
+        chains = [self.compiled_chain]
+        if self.preset_bank:
+            # Preloaded presets can be switched to live, so they must fit as well
+            chains += [chain for chain in self.preset_bank.loaded() if chain is not self.compiled_chain]
+        tuner = BlockSizeTuner(self.sample_rate, audio_config.AUTO_TUNE_HEADROOM, audio_config.AUTO_TUNE_BLOCK_SIZES,
+                               channels=self.input_channels)
+        result = tuner.tune(chains)
+        self._set_block_size(result["block_size"])
+        self.latency = (result["latency"], result["latency"])
+        print(f"   ✅ Block size {self.block_size}, latency {result['latency'] * 1000:.1f} ms per direction")
+
+    def _report_latency(self, stream):
+        input_latency, output_latency = stream.latency
+        block_ms = self.block_size / self.sample_rate * 1000
+        round_trip_ms = (input_latency + output_latency) * 1000 + block_ms
+        print(f"⏱️  Block {self.block_size} ({block_ms:.1f} ms), device latency in/out "
+              f"{input_latency * 1000:.1f}/{output_latency * 1000:.1f} ms, round trip ≈ {round_trip_ms:.1f} ms")
+
+    def _xruns_exceeded(self) -> bool:
+        """
+        True when more than XRUN_LIMIT xruns happened within the last XRUN_WINDOW_S.
+        """
+        now = time.monotonic()
+        window_start, window_count = self._xrun_window
+        if self.xruns - window_count >= audio_config.XRUN_LIMIT:
+            self._xrun_window = (now, self.xruns)
+            return True
+        if now - window_start >= audio_config.XRUN_WINDOW_S:
+            self._xrun_window = (now, self.xruns)
+        return False
+
+    def _step_up_block_size(self):
+        """
+        Moves to the next larger candidate block size (latency grows in proportion).
+        """
+        larger = [size for size in audio_config.AUTO_TUNE_BLOCK_SIZES if size > self.block_size]
+        if not larger:
+            return
+        scale = larger[0] / self.block_size
+        self._set_block_size(larger[0])
+        self.latency = tuple(latency * scale for latency in self.latency)
+        print(f"⚠️ Too many xruns: restarting the stream with block size {self.block_size}")
+
+    def _read_commands(self, commands):
+        """
+        Stdin reader thread: forwards each line to the command loop. End of input stops the engine.
+        """
+        while True:
+            try:
+                commands.put(input().strip())
+            except EOFError:
+                commands.put("")
+                return
+
+    def _command_loop(self, commands) -> bool:
+        """
+        Handles commands until an empty line (just 'Enter') stops the engine.
+        Returns True instead when the stream should restart with a larger block (--adaptive).
+        """
+        while True:
+            try:
+                command = commands.get(timeout=0.25)
+            except queue.Empty:
+                if self.activity:
+                    # Parameters change under automation and hot-reload: keep the idle tail current
+                    self.activity.set_tail(self.compiled_chain.effects)
+                if (self.adaptive and self._xruns_exceeded()
+                        and self.block_size < max(audio_config.AUTO_TUNE_BLOCK_SIZES)):
+                    return True
+                continue
+
+            if not command:
+                return False
+            if command == "stats" and (self.profiler or self.activity):
+                if self.profiler:
+                    print(self.profiler.report())
+                if self.activity:
+                    print(self.activity.report())
+            elif self.preset_bank and command in self.preset_bank:
+                self.switch_preset(command)
+            elif command.startswith("set "):
+                self._set_command(command.split()[1:])
+            elif command.startswith("seek ") and self.backing:
+                self._seek_command(command.split()[1:])
+            else:
+                print(f"⚠️ Unknown command: {command}")
+
+    def _set_command(self, args):
+        """
+        Handles `set <effect #|name> <param> <value>` from the command loop.
+        """
+        if len(args) != 3:
+            print("⚠️ Usage: set <effect #|name> <param> <value>")
+            return
+        effect, name, value = args
+        # The value stays a string: set_parameter() converts it to the parameter's type
+        # (VST3 choice parameters take their labels as strings)
+        try:
+            self.set_parameter(int(effect) if effect.isdigit() else effect, name, value)
+        except IndexError:
+            print(f"⚠️ No effect #{effect} in the running chain")
+
+    def _seek_command(self, args):
+        """
+        Handles `seek <seconds>` from the command loop.
+        """
+        try:
+            seconds = float(args[0]) if len(args) == 1 else None
+        except ValueError:
+            seconds = None
+        if seconds is None:
+            print("⚠️ Usage: seek <seconds>")
+            return
+        self.backing.seek(seconds)
+        print(f"⏩ Backing track at {seconds:.1f} s")
+
     def _save_recordings(self):
         """
         Saves any active recordings on shutdown.
         """
-        if self.clean_recorder or self.fx_recorder:
+        if self.clean_recorder or self.fx_recorder or self.recorder:
             print("\n💾 Saving recordings...")
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S.%f")[:18]
+            timestamp = self._take_timestamp or take_timestamp()
 
             if self.clean_recorder:
                 self.clean_recorder.save(timestamp=timestamp, suffix="-clean")
             if self.fx_recorder:
                 self.fx_recorder.save(timestamp=timestamp, suffix="-fx")
+            if self.recorder:
+                self.recorder.save()
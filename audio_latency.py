@@ -0,0 +1,177 @@
+import threading
+import numpy as np
+from audio_driver import FakeStreamDriver
+from chain_compiler import ChainCompiler
+
+# Feedback taps of a maximal-length LFSR per register length (primitive polynomials)
+MLS_TAPS = {10: (7,), 11: (9,), 12: (11, 10, 4), 13: (12, 11, 8), 14: (13, 12, 2), 15: (14,), 16: (15, 13, 4)}
+
+def mls(order: int) -> np.ndarray:
+    """
+    Maximum length sequence of 2**order - 1 samples (+1/-1). Its autocorrelation is a single
+    spike, so the cross-correlation with a captured copy peaks exactly at the delay.
+    """
+    state = np.ones(order, dtype=np.int8)
+    sequence = np.empty(2 ** order - 1, dtype=np.int8)
+    index = 0
+    for i in range(len(sequence)):
+        feedback = state[index]
+        sequence[i] = feedback
+        for tap in MLS_TAPS[order]:
+            feedback ^= state[(tap + index) % order]
+        state[index] = feedback
+        index = (index + 1) % order
+    return (1.0 - 2.0 * sequence).astype(np.float32)
+
+def estimate_delay(stimulus: np.ndarray, captured: np.ndarray) -> tuple:
+    """
+    Delay (in samples, sub-sample via a parabolic fit) of `stimulus` inside `captured` (mono 1D),
+    and the clarity of the correlation peak (peak / RMS of the correlation). The delay is the first
+    arrival within 6 dB of the strongest one, so a dry path wins over its own echoes, and a polarity
+    flip still counts as a match. Clarity stays high for delays and filters; a pitch shifter or
+    a fully wet reverb smears the peak, which is why it is reported.
+    """
+    size = 1 << int(np.ceil(np.log2(len(captured) + len(stimulus))))
+    correlation = np.fft.irfft(np.fft.rfft(captured, size) * np.conj(np.fft.rfft(stimulus, size)), size)
+    correlation = np.abs(correlation[:len(captured) - len(stimulus) + 1])
+    first = int(np.argmax(correlation >= 0.5 * correlation.max()))
+    peak = first + int(np.argmax(correlation[first:first + 16])) # Top of that arrival
+    delay = float(peak)
+    if 0 < peak < len(correlation) - 1:
+        left, centre, right = correlation[peak - 1:peak + 2]
+        curvature = left - 2.0 * centre + right
+        if curvature < 0:
+            delay += 0.5 * (left - right) / curvature
+    rms = float(np.sqrt(np.mean(correlation ** 2)))
+    return float(delay), float(correlation[peak]) / max(rms, 1e-12)
+
+def declared_latency(effect) -> float:
+    """
+    Algorithmic latency (samples) an effect declares: `latency_samples` (oversampled stages,
+    MyShifter, custom effects), the longest branch of a parallel block, or 0.
+    """
+    latency = getattr(effect, "latency_samples", None)
+    if latency is not None:
+        return float(latency)
+    if hasattr(effect, "branches"):
+        return max((sum(declared_latency(e) for e in branch.chain.effects) for branch in effect.branches), default=0.0)
+    return 0.0
+
+class LatencyMeter:
+    """
+    Round-trip latency measurement (--measure-latency).
+
+    An MLS burst (-12 dBFS) is played and the captured return is cross-correlated with it:
+      - device: the stimulus goes out of the engine's own stream (engine.open_stream(), the audio
+        device or a LoopbackStream) with the chain bypassed, and comes back through the input,
+      - chain: the stimulus goes through the engine's audio callback on a FakeStreamDriver,
+        then through every effect on its own, next to the latency it declares.
+    A cable (or the interface's direct monitoring loop) from output 1 to input 1 is needed on a real device.
+    """
+    def __init__(self, sample_rate: int, order: int = 14, level: float = 0.25, max_delay_s: float = 1.0):
+        self.sample_rate = sample_rate
+        self.stimulus = mls(order) * level
+        self.max_delay = int(max_delay_s * sample_rate)
+        self.min_clarity = 30.0 # Clean delays and filters score > 100, pitch shifters and wet reverbs < 20
+
+    def _padded(self, channels: int) -> np.ndarray:
+        signal = np.zeros((len(self.stimulus) + self.max_delay, channels), dtype=np.float32)
+        signal[:len(self.stimulus)] = self.stimulus[:, np.newaxis]
+        return signal
+
+    def measure_device(self, engine, timeout: float = 10.0) -> dict:
+        """
+        Plays the stimulus through the engine's stream and captures input 1.
+        """
+        played = self._padded(engine.output_channels)
+        captured = np.zeros(len(played), dtype=np.float32)
+        position = [0]
+        done = threading.Event()
+
+        def callback(indata, outdata, frames, _time, _status):
+            start = position[0]
+            count = max(0, min(frames, len(played) - start))
+            outdata.fill(0.0)
+            outdata[:count] = played[start:start + count]
+            captured[start:start + count] = indata[:count, 0]
+            position[0] = start + frames
+            if count < frames:
+                done.set()
+
+        with engine.open_stream(callback) as stream:
+            completed = done.wait(timeout)
+            input_latency, output_latency = stream.latency
+        if not completed:
+            raise RuntimeError(f"Latency measurement timed out after {timeout:.0f} s")
+
+        delay, clarity = estimate_delay(self.stimulus, captured)
+        reported = (input_latency + output_latency) * self.sample_rate + engine.block_size
+        return {"samples": delay, "clarity": clarity, "reported_samples": reported}
+
+    def _measure_chain(self, chain, block_size: int) -> tuple:
+        signal = self._padded(2)
+        chain.reset()
+        output = FakeStreamDriver(lambda indata, outdata, *_: np.copyto(outdata, chain.process(indata, self.sample_rate)),
+                                  block_size).run(signal)
+        chain.reset()
+        return estimate_delay(self.stimulus, output[:, 0])
+
+    def measure_chain(self, engine) -> dict:
+        """
+        Measures the whole engine callback, then each effect on its own.
+        """
+        if engine.isolated_chain:
+            # The effects live in the worker process: only the lookahead is known here
+            return {"samples": None, "clarity": None, "effects": []}
+
+        signal = self._padded(engine.input_channels)
+        engine.compiled_chain.reset()
+        output = FakeStreamDriver(engine._audio_callback, engine.block_size,
+                                  channels=(engine.input_channels, engine.output_channels)).run(signal)
+        engine.compiled_chain.reset()
+        delay, clarity = estimate_delay(self.stimulus, output[:, 0])
+
+        effects = []
+        for effect in engine.chain:
+            name = type(getattr(effect, "effect", effect)).__name__
+            measured, effect_clarity = self._measure_chain(ChainCompiler.compile([effect], group_native=False),
+                                                           engine.block_size)
+            effects.append({"name": name, "samples": measured, "clarity": effect_clarity,
+                            "declared_samples": declared_latency(effect)})
+        return {"samples": delay, "clarity": clarity, "effects": effects}
+
+    def measure(self, engine) -> dict:
+        lookahead = engine.isolated_chain.lookahead * engine.block_size if engine.isolated_chain else 0
+        return {
+            "sample_rate": self.sample_rate,
+            "block_size": engine.block_size,
+            "device": self.measure_device(engine),
+            "chain": self.measure_chain(engine),
+            "lookahead_samples": lookahead,
+        }
+
+    def _format(self, samples, clarity) -> str:
+        if samples is None:
+            return "not measured"
+        text = f"{samples:7.1f} samples ({samples / self.sample_rate * 1000:6.2f} ms)"
+        return text if clarity >= self.min_clarity else text + f"  ⚠️ unclear peak (clarity {clarity:.1f})"
+
+    def report(self, result: dict) -> str:
+        device = result["device"]
+        chain = result["chain"]
+        lines = [f"⏱️  Latency at {result['sample_rate']} Hz, block {result['block_size']}:",
+                 f"   Device round trip:   {self._format(device['samples'], device['clarity'])}",
+                 f"   Reported by stream:  {self._format(device['reported_samples'], np.inf)}",
+                 f"   Effect chain:        {self._format(chain['samples'], chain['clarity'])}"]
+        for index, effect in enumerate(chain["effects"], 1):
+            lines.append(f"      {index}. {effect['name']:<18} {self._format(effect['samples'], effect['clarity'])}"
+                         f"  declared {effect['declared_samples']:.1f}")
+        if result["lookahead_samples"]:
+            lines.append(f"   Isolation lookahead: {self._format(result['lookahead_samples'], np.inf)}")
+        chain_samples = chain["samples"] or 0.0
+        if chain["samples"] is not None and chain["clarity"] < self.min_clarity:
+            # No usable peak (e.g. a pitch shifter): trust what the effects declare instead
+            chain_samples = sum(effect["declared_samples"] for effect in chain["effects"])
+        total = device["samples"] + chain_samples + result["lookahead_samples"]
+        lines.append(f"   Input → output:      {self._format(total, np.inf)}")
+        return "\n".join(lines)
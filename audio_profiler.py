@@ -0,0 +1,129 @@
+import numpy as np
+
+class CallbackProfiler:
+    """
+    Opt-in instrumentation for PedalboardEngine._audio_callback.
+
+    The callback only increments counters in preallocated numpy histograms
+    (1 µs bins, up to 4x the block deadline); it never prints or allocates.
+    Percentiles and the report are computed from another thread with report().
+    """
+    BIN_NS = 1000 # 1 µs histogram resolution
+    ROW_CHUNK = 64 # Histogram rows are allocated this many at a time, ahead of register_stages()
+
+    def __init__(self, block_size: int, sample_rate: int):
+        # Row 0 is the whole callback; stages are added with register_stages()
+        self.labels = ["(callback total)"]
+        self.total_index = 0
+        self.set_block_size(block_size, sample_rate)
+
+    def set_block_size(self, block_size: int, sample_rate: int):
+        """
+        (Re)starts the statistics for a new block deadline, keeping the registered stages.
+        Call from the main thread while no stream is running.
+        """
+        self.deadline_ns = int(block_size * 1e9 / sample_rate)
+        self.num_bins = 4 * self.deadline_ns // self.BIN_NS + 1
+        rows = -(-len(self.labels) // self.ROW_CHUNK) * self.ROW_CHUNK
+        self.histograms = np.zeros((rows, self.num_bins), dtype=np.int64)
+        self.max_ns = np.zeros(rows, dtype=np.int64)
+
+        # Callback-level counters
+        self.blocks = 0
+        self.deadline_misses = 0
+        self.input_underflows = 0
+        self.input_overflows = 0
+        self.output_underflows = 0
+        self.output_overflows = 0
+
+    def register_stages(self, stage_names: list) -> list:
+        """
+        Takes histogram rows for a chain's stages and returns their indices.
+        Call from any thread but the audio thread, before the chain can run in the callback:
+        the rows are preallocated, so the arrays the callback writes to normally stay in place.
+        """
+        first = len(self.labels)
+        if first + len(stage_names) > self.histograms.shape[0]:
+            self._grow(first + len(stage_names))
+        self.labels += list(stage_names)
+        return list(range(first, len(self.labels)))
+
+    def _grow(self, rows: int):
+        """
+        Adds another chunk of rows (only after ROW_CHUNK stages, e.g. many hot-reloads).
+        Counts the callback records into the old arrays while they are copied are merged afterwards.
+        """
+        rows = -(-rows // self.ROW_CHUNK) * self.ROW_CHUNK
+        old_histograms, old_max = self.histograms, self.max_ns
+        used = old_histograms.shape[0]
+        snapshot = old_histograms.copy()
+        histograms = np.zeros((rows, self.num_bins), dtype=np.int64)
+        histograms[:used] = snapshot
+        max_ns = np.zeros(rows, dtype=np.int64)
+        max_ns[:used] = old_max
+        self.histograms, self.max_ns = histograms, max_ns
+        histograms[:used] += old_histograms - snapshot
+        np.maximum(max_ns[:used], old_max, out=max_ns[:used])
+
+    def record(self, index: int, elapsed_ns: int):
+        """Adds one timing sample for a stage (or the callback total)."""
+        bin_index = elapsed_ns // self.BIN_NS
+        if bin_index >= self.num_bins:
+            bin_index = self.num_bins - 1 # Last bin collects everything slower
+        self.histograms[index, bin_index] += 1
+        if elapsed_ns > self.max_ns[index]:
+            self.max_ns[index] = elapsed_ns
+
+    def record_callback(self, elapsed_ns: int):
+        """Adds the total callback time and checks it against the block deadline."""
+        self.blocks += 1
+        self.record(self.total_index, elapsed_ns)
+        if elapsed_ns > self.deadline_ns:
+            self.deadline_misses += 1
+
+    def record_status(self, status):
+        """Counts the xrun flags of a sounddevice CallbackFlags object."""
+        if not status:
+            return
+        self.input_underflows += bool(status.input_underflow)
+        self.input_overflows += bool(status.input_overflow)
+        self.output_underflows += bool(status.output_underflow)
+        self.output_overflows += bool(status.output_overflow)
+
+    def percentile_us(self, index: int, q: float) -> float:
+        """Upper edge (µs) of the histogram bin holding the q-th percentile (q in 0..100)."""
+        counts = self.histograms[index].copy() # The callback may still be writing
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        bin_index = int(np.searchsorted(np.cumsum(counts), total * q / 100.0))
+        return (bin_index + 1) * self.BIN_NS / 1000.0
+
+    def summary(self) -> list:
+        """Per-stage statistics as a list of dicts (p50/p99/max in µs)."""
+        rows = []
+        # Stages first, callback total last
+        order = list(range(1, len(self.labels))) + [self.total_index]
+        for index in order:
+            label = self.labels[index]
+            rows.append({
+                "stage": label,
+                "p50_us": self.percentile_us(index, 50),
+                "p99_us": self.percentile_us(index, 99),
+                "max_us": self.max_ns[index] / 1000.0,
+            })
+        return rows
+
+    def report(self) -> str:
+        """Human readable report; safe to call from any thread while the stream runs."""
+        deadline_us = self.deadline_ns / 1000.0
+        lines = [f"📊 Callback profile: {self.blocks} blocks, deadline {deadline_us:.0f} µs"]
+        lines.append(f"   {'stage':<32} {'p50 µs':>8} {'p99 µs':>8} {'max µs':>8}")
+        for row in self.summary():
+            lines.append(f"   {row['stage']:<32} {row['p50_us']:>8.0f} {row['p99_us']:>8.0f} {row['max_us']:>8.0f}")
+
+        miss_ratio = self.deadline_misses / self.blocks * 100 if self.blocks else 0.0
+        lines.append(f"   Deadline misses: {self.deadline_misses} ({miss_ratio:.2f}%)")
+        lines.append(f"   Input underflow/overflow: {self.input_underflows}/{self.input_overflows}, "
+                     f"output underflow/overflow: {self.output_underflows}/{self.output_overflows}")
+        return "\n".join(lines)
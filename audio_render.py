@@ -0,0 +1,109 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import soundfile as sf
+from chain_compiler import ChainCompiler
+from mod_activity import chain_tail_seconds
+from plugin_manager import PluginManager
+
+RENDER_BLOCK_SIZE = 8192 # Offline rendering has no latency budget, so use large blocks
+MAX_TAIL_S = 30.0 # Rendered after the input when a tail never decays (e.g. Reverb freeze_mode)
+AUDIO_EXTENSIONS = (".wav", ".flac", ".aif", ".aiff", ".ogg")
+
+def build_chain(plugin_config: list):
+    """
+    Builds a compiled chain from a preset config, exactly like the live engine does.
+    """
+    return ChainCompiler.compile(PluginManager.load_effect_chain(plugin_config))
+
+def render_file(in_path: str, out_path: str, chain, block_size: int = RENDER_BLOCK_SIZE) -> float:
+    """
+    Streams `in_path` through `chain` block by block and writes a stereo file to `out_path`.
+    Mono inputs are duplicated to both channels. After the input, silence is fed for the chain's
+    tail (reverb and delay trails, see mod_activity), so the file ends once they have decayed.
+    Returns the duration rendered in seconds.
+    """
+    chain.reset()
+    tail_seconds = min(chain_tail_seconds(chain.effects), MAX_TAIL_S)
+
+    with sf.SoundFile(in_path) as infile:
+        sample_rate = infile.samplerate
+        out_format = os.path.splitext(out_path)[1][1:].upper() or "WAV"
+        # Prefer float output so a hot preset does not clip the rendered file
+        subtype = "FLOAT" if sf.check_format(out_format, "FLOAT") else None
+
+        stereo = np.zeros((block_size, 2), dtype=np.float32)
+        with sf.SoundFile(out_path, mode="w", samplerate=sample_rate, channels=2, subtype=subtype) as outfile:
+            for data in infile.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+                frames = data.shape[0]
+                block = stereo[:frames]
+                block[:] = data[:, :2] if data.shape[1] >= 2 else data
+
+                outfile.write(chain.process(block, sample_rate))
+
+            # Let the tails ring out
+            tail_frames = int(math.ceil(tail_seconds * sample_rate))
+            for start in range(0, tail_frames, block_size):
+                block = stereo[:min(block_size, tail_frames - start)]
+                block.fill(0.0)
+                outfile.write(chain.process(block, sample_rate))
+
+        return (infile.frames + tail_frames) / sample_rate
+
+# --------------------------------------------------------------------------------
+# Batch rendering: one chain instance per worker process
+# --------------------------------------------------------------------------------
+
+_WORKER_STATE = {}
+
+def _init_worker(plugin_config):
+    _WORKER_STATE["chain"] = build_chain(plugin_config)
+
+def _render_job(job):
+    in_path, out_path = job
+    start_time = time.perf_counter()
+    duration = render_file(in_path, out_path, _WORKER_STATE["chain"])
+    return out_path, duration, time.perf_counter() - start_time
+
+def render_directory(in_dir: str, out_dir: str, plugin_config: list, workers: int = None):
+    """
+    Renders every audio file in `in_dir` into `out_dir` (same file names) across a process pool.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [
+        (os.path.join(in_dir, filename), os.path.join(out_dir, filename))
+        for filename in sorted(os.listdir(in_dir))
+        if filename.lower().endswith(AUDIO_EXTENSIONS)
+    ]
+    if not jobs:
+        print(f"⚠️ No audio files found in {in_dir}")
+        return
+
+    print(f"🎚️  Rendering {len(jobs)} files with {workers or os.cpu_count()} workers...")
+    start_time = time.perf_counter()
+    total_duration = 0.0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plugin_config,)) as pool:
+        for out_path, duration, elapsed in pool.map(_render_job, jobs):
+            total_duration += duration
+            print(f"   ✅ {out_path} ({duration:.1f}s audio, {duration / elapsed:.1f}x realtime)")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"✅ Rendered {total_duration:.1f}s of audio in {elapsed:.1f}s ({total_duration / elapsed:.1f}x realtime)")
+
+def render(in_path: str, out_path: str, plugin_config: list, workers: int = None):
+    """
+    Entry point for `main.py --render`: a single file, or a whole directory in parallel.
+    """
+    if os.path.isdir(in_path):
+        render_directory(in_path, out_path, plugin_config, workers)
+        return
+
+    print(f"🎚️  Rendering {in_path} -> {out_path}")
+    chain = build_chain(plugin_config)
+    start_time = time.perf_counter()
+    duration = render_file(in_path, out_path, chain)
+    elapsed = time.perf_counter() - start_time
+    print(f"✅ Rendered {duration:.1f}s of audio in {elapsed:.2f}s ({duration / elapsed:.1f}x realtime)")
@@ -0,0 +1,168 @@
+import time
+import numpy as np
+import pedalboard
+
+class NativeStage:
+    """
+    A run of consecutive pedalboard (C++) effects, processed as a single pedalboard.Pedalboard.
+    Pedalboard works channels-first, so the block is transposed once on the way in and once on the
+    way out, into preallocated contiguous float32 buffers (owned by the engine's BufferArena once bound).
+    """
+    allocates = True # pedalboard returns a new array from every call
+
+    def __init__(self, effects):
+        self.effects = effects
+        self.board = pedalboard.Pedalboard(effects)
+        self.name = " > ".join(type(effect).__name__ for effect in effects)
+        self._planar = None # (channels, samples) input handed to pedalboard
+        self._interleaved = None # (samples, channels) output handed to the next stage
+
+    def _allocate(self, num_samples, channels):
+        self._planar = np.zeros((channels, num_samples), dtype=np.float32)
+        self._interleaved = np.zeros((num_samples, channels), dtype=np.float32)
+
+    def bind(self, arena, key):
+        self._planar = arena.block((key, "planar"), planar=True, channels=2)
+        self._interleaved = arena.block((key, "out"), channels=2)
+
+    def __call__(self, signal, sample_rate):
+        # signal shape: (num_samples, channels)
+        if self._interleaved is None or self._interleaved.shape != signal.shape:
+            self._allocate(*signal.shape)
+
+        np.copyto(self._planar, signal.T)
+        # reset=False keeps reverb/delay tails alive between streaming blocks
+        processed = self.board(self._planar, sample_rate=sample_rate, reset=False)
+        np.copyto(self._interleaved, processed.T)
+        return self._interleaved
+
+    def reset(self):
+        self.board.reset()
+
+class CustomStage:
+    """
+    A single fx_custom (Python) effect. Custom effects work samples-first, like the engine itself.
+
+    Effects that implement the in-place protocol, `process(in_buf, out_buf)` (sample rate from
+    prepare()), write straight into this stage's arena block; others are called as
+    `effect(signal, sample_rate)` and return their own buffer.
+    """
+    def __init__(self, effect):
+        self.effect = effect
+        self.name = type(effect).__name__
+        # Looked up on the class: wrappers forwarding attributes (OversampledEffect) must not match
+        self.in_place = callable(getattr(type(effect), "process", None))
+        self.allocates = getattr(effect, "allocates", False)
+        self.prepared_block_size = None # Block size this stage last prepared the effect for
+        self._out = None
+
+    def bind(self, arena, key):
+        self._out = arena.block((key, "out"), channels=2)
+        if callable(getattr(type(self.effect), "bind", None)):
+            self.effect.bind(arena, key) # Effects with inner chains (ParallelBlock) bind them too
+        # process() runs at the rate and within the buffers given to prepare(): PluginManager prepared
+        # the effect for audio_config, so an engine running at another rate, or rebinding to a larger
+        # block (--auto-tune, --adaptive), prepares it again here
+        if self.in_place and hasattr(self.effect, "prepare") and arena.sample_rate is not None \
+                and (getattr(self.effect, "sample_rate", None) != arena.sample_rate
+                     or self.prepared_block_size is None or arena.block_size > self.prepared_block_size):
+            self.effect.prepare(arena.sample_rate, arena.block_size)
+            self.prepared_block_size = arena.block_size
+
+    def __call__(self, signal, sample_rate):
+        out = self._out
+        if self.in_place and out is not None and out.shape == signal.shape:
+            self.effect.process(signal, out)
+            return out
+        return self.effect(signal, sample_rate)
+
+    def reset(self):
+        if hasattr(self.effect, "reset"):
+            self.effect.reset()
+
+class CompiledChain:
+    """
+    An effect chain resolved into stages ahead of time, so the audio callback only iterates stages.
+    Input and output blocks are (samples, channels).
+    """
+    def __init__(self, stages, effects=None, name=None):
+        self.stages = stages
+        self.effects = effects if effects is not None else []
+        self.name = name
+        self.profile_indices = None # CallbackProfiler rows, set when the chain is profiled
+
+    def process(self, signal, sample_rate):
+        for stage in self.stages:
+            signal = stage(signal, sample_rate)
+        return signal
+
+    def reset(self):
+        """
+        Clears the internal state (delay lines, reverb tails...) of every stage.
+        """
+        for stage in self.stages:
+            stage.reset()
+
+    def bind(self, arena):
+        """
+        Gives every stage its output block(s) from the engine's BufferArena.
+        Call outside the audio thread (load time, block size change).
+        """
+        for index, stage in enumerate(self.stages):
+            stage.bind(arena, (id(self), index))
+
+    def stage_labels(self) -> list:
+        prefix = f"{self.name}: " if self.name else ""
+        return [prefix + stage.name for stage in self.stages]
+
+    def process_profiled(self, signal, sample_rate, profiler):
+        """
+        Same as process(), but records each stage's time into a CallbackProfiler
+        (rows registered in profile_indices).
+        """
+        for index, stage in zip(self.profile_indices, self.stages):
+            start = time.perf_counter_ns()
+            signal = stage(signal, sample_rate)
+            profiler.record(index, time.perf_counter_ns() - start)
+        return signal
+
+    def process_checked(self, signal, sample_rate, guard):
+        """
+        Same as process(), with every stage checked by a RealtimeGuard (--debug-rt).
+        """
+        for stage in self.stages:
+            signal = guard.run(stage, signal, sample_rate)
+        return signal
+
+class ChainCompiler:
+    """
+    Turns the list of effects built by PluginManager into a CompiledChain.
+    Runs once at load time: layouts are decided here instead of on every audio block.
+    """
+
+    @staticmethod
+    def compile(chain: list, group_native: bool = True, name: str = None) -> CompiledChain:
+        """
+        Groups consecutive native effects into one NativeStage (unless group_native is False)
+        and wraps every other effect in a CustomStage.
+        """
+        stages = []
+        native_run = []
+
+        for effect in chain:
+            if isinstance(effect, pedalboard.Plugin):
+                native_run.append(effect)
+                if not group_native:
+                    stages.append(NativeStage(native_run))
+                    native_run = []
+                continue
+
+            if native_run:
+                stages.append(NativeStage(native_run))
+                native_run = []
+            stages.append(CustomStage(effect))
+
+        if native_run:
+            stages.append(NativeStage(native_run))
+
+        return CompiledChain(stages, effects=list(chain), name=name)
@@ -0,0 +1,192 @@
+import numpy as np
+import pedalboard
+import audio_config
+from fx_custom.kernel import HAS_NUMBA, KernelEffect, jit
+
+# Effects the pass folds into a biquad cascade (all linear, time-invariant IIR filters)
+FILTERS = (pedalboard.HighpassFilter, pedalboard.LowpassFilter, pedalboard.PeakFilter,
+           pedalboard.LowShelfFilter, pedalboard.HighShelfFilter)
+
+# type -> (param, value) that turns the effect into an exact pass-through (checked bit-exact)
+IDENTITY = {
+    pedalboard.Gain: ("gain_db", 0.0),
+    pedalboard.PeakFilter: ("gain_db", 0.0),
+    pedalboard.LowShelfFilter: ("gain_db", 0.0),
+    pedalboard.HighShelfFilter: ("gain_db", 0.0),
+    pedalboard.Compressor: ("ratio", 1.0),
+    pedalboard.Chorus: ("mix", 0.0),
+    pedalboard.Phaser: ("mix", 0.0),
+    pedalboard.Delay: ("mix", 0.0),
+}
+
+def biquad_coefficients(effect, sample_rate: int) -> np.ndarray:
+    """
+    Normalized [b0, b1, b2, a1, a2] of a pedalboard filter, with the same design formulas as
+    JUCE's IIR::Coefficients (what pedalboard runs). Low/highpass are first order (6 dB/octave).
+    """
+    frequency = effect.cutoff_frequency_hz
+    if isinstance(effect, (pedalboard.LowpassFilter, pedalboard.HighpassFilter)):
+        n = np.tan(np.pi * frequency / sample_rate)
+        b = [n, n, 0.0] if isinstance(effect, pedalboard.LowpassFilter) else [1.0, -1.0, 0.0]
+        a = [n + 1.0, n - 1.0, 0.0]
+    elif isinstance(effect, pedalboard.PeakFilter):
+        gain = np.sqrt(10.0 ** (effect.gain_db / 20.0))
+        omega = 2.0 * np.pi * frequency / sample_rate
+        alpha = np.sin(omega) / (2.0 * effect.q)
+        c2 = -2.0 * np.cos(omega)
+        b = [1.0 + alpha * gain, c2, 1.0 - alpha * gain]
+        a = [1.0 + alpha / gain, c2, 1.0 - alpha / gain]
+    else:
+        gain = np.sqrt(10.0 ** (effect.gain_db / 20.0))
+        minus, plus = gain - 1.0, gain + 1.0
+        omega = 2.0 * np.pi * max(frequency, 2.0) / sample_rate
+        cos = np.cos(omega)
+        beta = np.sin(omega) * np.sqrt(gain) / effect.q
+        if isinstance(effect, pedalboard.LowShelfFilter):
+            b = [gain * (plus - minus * cos + beta), 2.0 * gain * (minus - plus * cos), gain * (plus - minus * cos - beta)]
+            a = [plus + minus * cos + beta, -2.0 * (minus + plus * cos), plus + minus * cos - beta]
+        else:
+            b = [gain * (plus + minus * cos + beta), -2.0 * gain * (minus + plus * cos), gain * (plus + minus * cos - beta)]
+            a = [plus - minus * cos + beta, 2.0 * (minus - plus * cos), plus - minus * cos - beta]
+    return np.array([b[0], b[1], b[2], a[1], a[2]], dtype=np.float64) / a[0]
+
+@jit
+def _cascade_kernel(block, out, coefficients, state):
+    # Transposed direct form II, float64 state; every sample runs through all sections in turn
+    for channel in range(block.shape[1]):
+        for i in range(block.shape[0]):
+            x = np.float64(block[i, channel])
+            for s in range(coefficients.shape[0]):
+                y = coefficients[s, 0] * x + state[s, channel, 0]
+                state[s, channel, 0] = coefficients[s, 1] * x - coefficients[s, 3] * y + state[s, channel, 1]
+                state[s, channel, 1] = coefficients[s, 2] * x - coefficients[s, 4] * y
+                x = y
+            out[i, channel] = x
+
+def rewritable(effect) -> bool:
+    """
+    True for effects the optimizer may drop, fold or fuse. Only these lose their live parameters
+    in an optimized chain; every other effect keeps its place and can be automated as usual.
+    """
+    return type(effect) is pedalboard.Gain or type(effect) in FILTERS or type(effect) in IDENTITY
+
+class BiquadCascade(KernelEffect):
+    """
+    A run of pedalboard filters (and Gains) fused into one stage: one biquad section per filter,
+    the gains folded into the first section, all computed by one compiled loop per block.
+    Built by ChainOptimizer; coefficients follow the engine rate given to prepare().
+    Without numba the kernel runs as plain Python (fine offline, too slow for a live stream).
+    """
+    def __init__(self, filters: list, gain_db: float = 0.0, use_jit: bool = True):
+        super().__init__(use_jit)
+        self.filters = filters
+        self.gain_db = gain_db
+        self.name = " > ".join(type(effect).__name__ for effect in filters)
+        self._coefficients = None
+        self._state = np.zeros((len(filters), 2, 2), dtype=np.float64)
+        self._rate = None # Rate the coefficients were computed for
+
+    def _build(self, sample_rate: int):
+        coefficients = np.array([biquad_coefficients(effect, sample_rate) for effect in self.filters])
+        coefficients[0, :3] *= 10.0 ** (self.gain_db / 20.0)
+        self._coefficients = coefficients
+        self._rate = sample_rate
+
+    def prepare(self, sample_rate: int, block_size: int, channels: int = 2):
+        self._build(sample_rate)
+        self._state = np.zeros((len(self.filters), channels, 2), dtype=np.float64)
+        super().prepare(sample_rate, block_size, channels)
+
+    def reset(self):
+        self._state.fill(0.0)
+
+    def _process_kernel(self, input_array, out, sample_rate):
+        if sample_rate != self._rate:
+            self._build(sample_rate)
+        _cascade_kernel(input_array, out, self._coefficients, self._state)
+
+    _process_numpy = _process_kernel # Same loop, uncompiled
+
+    def __repr__(self):
+        return f"<BiquadCascade {self.name} gain_db={self.gain_db:g}>"
+
+class ChainOptimizer:
+    """
+    Rewrites the list of effects built by PluginManager before it is compiled (--optimize):
+      1. drops native effects whose params make them an exact pass-through (Gain 0 dB, mix 0...),
+      2. folds consecutive Gains into one,
+      3. fuses runs of two or more adjacent filters (with the Gains between them) into a
+         BiquadCascade: one stage instead of one module call per filter.
+    The effects it was given are never modified; folded stages are new objects. Oversampled,
+    custom, VST3 and parallel effects are left where they are and split the runs.
+    Fused stages no longer exist as separate effects, so their params cannot be changed live.
+    """
+
+    @staticmethod
+    def _is_identity(effect) -> bool:
+        rule = IDENTITY.get(type(effect))
+        return rule is not None and getattr(effect, rule[0]) == rule[1]
+
+    @staticmethod
+    def optimize(chain: list, sample_rate: int = None, block_size: int = None, verbose: bool = True) -> list:
+        """
+        Returns the optimized list of effects and prints what changed.
+        """
+        sample_rate = sample_rate or audio_config.SAMPLE_RATE
+        block_size = block_size or audio_config.BLOCK_SIZE
+        notes = []
+
+        # 1. Identity stages
+        kept = []
+        for effect in chain:
+            if ChainOptimizer._is_identity(effect):
+                param, value = IDENTITY[type(effect)]
+                notes.append(f"Dropped {type(effect).__name__} ({param}={value:g}: no effect)")
+                continue
+            kept.append(effect)
+
+        # 2. + 3. Runs of linear native effects
+        result = []
+        run = []
+        for effect in kept + [None]:
+            if effect is not None and (type(effect) is pedalboard.Gain or type(effect) in FILTERS):
+                run.append(effect)
+                continue
+            result += ChainOptimizer._fuse(run, sample_rate, block_size, notes)
+            run = []
+            if effect is not None:
+                result.append(effect)
+
+        if verbose and notes:
+            print(f"🧹 Chain optimizer: {len(chain)} -> {len(result)} effects")
+            for note in notes:
+                print(f"   {note}")
+        return result
+
+    @staticmethod
+    def _fuse(run: list, sample_rate: int, block_size: int, notes: list) -> list:
+        filters = [effect for effect in run if type(effect) in FILTERS]
+        gains = [effect for effect in run if type(effect) is pedalboard.Gain]
+        gain_db = sum(effect.gain_db for effect in gains)
+
+        if len(filters) >= 2 and HAS_NUMBA:
+            cascade = BiquadCascade(filters, gain_db)
+            cascade.prepare(sample_rate, block_size)
+            notes.append(f"Merged {' > '.join(type(effect).__name__ for effect in run)} into a "
+                         f"{len(filters)}-section biquad cascade")
+            return [cascade]
+        if len(gains) < 2:
+            return run
+
+        # Filters commute with Gains: one Gain in place of the first, the filters keep their order
+        folded = [] if gain_db == 0.0 else [pedalboard.Gain(gain_db=gain_db)]
+        notes.append(f"Folded {len(gains)} Gains into Gain({gain_db:+g} dB)" if folded
+                     else f"Dropped {len(gains)} Gains that cancel out (0 dB)")
+        result = []
+        for effect in run:
+            if type(effect) is pedalboard.Gain:
+                result += folded
+                folded = []
+            else:
+                result.append(effect)
+        return result
@@ -0,0 +1,155 @@
+import threading
+import weakref
+import numpy as np
+from chain_compiler import ChainCompiler
+
+class BranchWorker:
+    """
+    A persistent thread that runs one job (a parallel branch, a router route) for the audio thread.
+    pedalboard's C++ plugins release the GIL while processing, so jobs really do run on separate cores.
+
+    The block is handed over through preallocated slots and two plain locks used as binary
+    semaphores (a Lock may be released by another thread): start() and result() allocate nothing
+    and never touch a queue, a Future or a Condition, unlike a ThreadPoolExecutor submit.
+    The thread only holds a weak reference between jobs and exits once its owner is gone.
+    """
+    def __init__(self, func, name: str = "fx-branch"):
+        self.func = func
+        self._signal = None
+        self._sample_rate = None
+        self._result = None
+        self._error = None
+        self._start = threading.Lock()
+        self._start.acquire()
+        self._done = threading.Lock()
+        self._done.acquire()
+        thread = threading.Thread(target=BranchWorker._loop, args=(weakref.ref(self), self._start),
+                                  daemon=True, name=name)
+        thread.start()
+
+    def __del__(self):
+        self._start.release() # Wakes the thread, which finds its owner gone and exits
+
+    def start(self, signal, sample_rate):
+        self._signal = signal
+        self._sample_rate = sample_rate
+        self._start.release()
+
+    def wait(self):
+        """
+        Waits for the job started by start(). Every start() needs exactly one wait().
+        """
+        self._done.acquire()
+
+    def result(self):
+        """
+        The finished job's output (after wait()); an exception raised by the job is raised here.
+        """
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return self._result
+
+    def _run(self):
+        try:
+            self._result = self.func(self._signal, self._sample_rate)
+        except Exception as e: # pylint: disable=broad-except
+            self._error = e # Re-raised on the audio thread, where the engine's failsafe handles it
+        self._done.release()
+
+    @staticmethod
+    def _loop(ref, start):
+        while True:
+            start.acquire()
+            worker = ref()
+            if worker is None:
+                return
+            worker._run() # pylint: disable=protected-access
+            del worker
+
+class ParallelBranch:
+    """
+    One branch of a ParallelBlock: which input channel(s) it listens to, its chain,
+    and its gain per output channel at the merge.
+    """
+    INPUTS = ("both", "left", "right")
+
+    def __init__(self, effects: list, mix: float = 1.0, pan: float = 0.0, source: str = "both"):
+        if source not in self.INPUTS:
+            raise ValueError(f"Unknown branch input: {source} (expected one of {self.INPUTS})")
+        self.chain = ChainCompiler.compile(effects)
+        self.source = source
+        self.mix = mix
+        self.pan = pan
+
+        # Equal-power pan, normalised so pan=0 leaves both channels at unity
+        theta = (pan + 1.0) * np.pi / 4
+        self.gains = (mix * np.sqrt(2.0) * np.array([np.cos(theta), np.sin(theta)])).astype(np.float32)
+        self._input = None
+
+    def bind(self, arena, key):
+        """
+        Binds this branch's stages (and its split input) to the engine's BufferArena under `key`.
+        """
+        self._input = arena.block((key, "input"), channels=2)
+        for index, stage in enumerate(self.chain.stages):
+            stage.bind(arena, (key, index))
+
+    def process(self, signal, sample_rate):
+        if self.source == "both":
+            return self.chain.process(signal, sample_rate)
+
+        # Stereo split: feed one input channel to both channels of this branch
+        if self._input is None or self._input.shape != signal.shape:
+            self._input = np.zeros(signal.shape, dtype=np.float32)
+        self._input[:] = signal[:, :1] if self.source == "left" else signal[:, 1:2]
+        return self.chain.process(self._input, sample_rate)
+
+class ParallelBlock:
+    """
+    Splits the signal into independent branches, runs them concurrently (the first on the calling
+    thread, every other one on its own BranchWorker) and sums them back with per-branch mix and pan.
+    Built by PluginManager from a {"type": "parallel", "branches": [...]} config entry and
+    processed like a custom effect: (samples, channels) in and out.
+    """
+    def __init__(self, branches: list):
+        self.branches = branches
+        self._workers = [BranchWorker(branch.process) for branch in branches[1:]]
+        self._out = None
+        self._scratch = None
+
+    def bind(self, arena, key):
+        """
+        Called by the CustomStage holding this block: the mix buffers and every branch chain take
+        their blocks from the arena, under keys derived from the stage's own key.
+        """
+        self._out = arena.block((key, "parallel"), channels=2)
+        self._scratch = arena.block((key, "scratch"), channels=2)
+        for index, branch in enumerate(self.branches):
+            branch.bind(arena, (key, "branch", index))
+
+    def reset(self):
+        for branch in self.branches:
+            branch.chain.reset()
+
+    def __call__(self, input_array, sample_rate):
+        if self._out is None or self._out.shape != input_array.shape:
+            self._out = np.zeros(input_array.shape, dtype=np.float32)
+            self._scratch = np.zeros(input_array.shape, dtype=np.float32)
+
+        # Other branches go to their workers; the first one runs on the calling (audio) thread
+        for worker in self._workers:
+            worker.start(input_array, sample_rate)
+
+        first = self.branches[0]
+        try:
+            np.multiply(first.process(input_array, sample_rate), first.gains, out=self._out)
+        finally:
+            # Collected even when the first branch raises, so no handoff is left over for the next block
+            for worker in self._workers:
+                worker.wait()
+        for branch, worker in zip(self.branches[1:], self._workers):
+            np.multiply(worker.result(), branch.gains, out=self._scratch)
+            self._out += self._scratch
+
+        return self._out
@@ -0,0 +1,168 @@
+import numpy as np
+from chain_compiler import ChainCompiler, NativeStage
+from chain_optimizer import ChainOptimizer
+from chain_parallel import BranchWorker
+from plugin_manager import PluginManager
+
+class InputRoute:
+    """
+    One instrument on the interface: its input channel (mono) or channel pair (stereo),
+    its own effect chain, and where the chain's stereo output goes in the mixer.
+    A mono input is fed to both channels of the chain.
+    """
+    def __init__(self, chain, inputs, outputs=(0, 1), gain: float = 1.0, pan: float = 0.0, name: str = None):
+        if len(inputs) not in (1, 2) or len(outputs) not in (1, 2):
+            raise ValueError(f"A route takes 1-2 input and 1-2 output channels, got {inputs} -> {outputs}")
+        self.chain = chain
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.gain = gain
+        self.pan = pan
+        self.name = name or f"in {'+'.join(str(i + 1) for i in self.inputs)}"
+        # Routes made only of native stages release the GIL and are worth running on a worker thread
+        self.native = all(isinstance(stage, NativeStage) for stage in getattr(chain, "stages", []))
+
+        # Mixer matrix (chain channel -> route output): equal-power pan to a pair, or a mono sum
+        if len(self.outputs) == 2:
+            theta = (pan + 1.0) * np.pi / 4
+            self.matrix = np.diag(gain * np.sqrt(2.0) * np.array([np.cos(theta), np.sin(theta)]))
+        else:
+            self.matrix = np.full((2, 1), 0.5 * gain)
+        self.matrix = self.matrix.astype(np.float32)
+        self._input = None
+        self._mixed = None
+
+    def bind(self, arena):
+        self._input = arena.block((id(self), "in"), channels=2)
+        self._mixed = arena.block((id(self), "mixed"), channels=len(self.outputs))
+        if hasattr(self.chain, "bind"):
+            self.chain.bind(arena)
+
+    def gather(self, signal):
+        frames = signal.shape[0]
+        if self._input is None or self._input.shape[0] != frames:
+            self._input = np.zeros((frames, 2), dtype=np.float32)
+            self._mixed = np.zeros((frames, len(self.outputs)), dtype=np.float32)
+        if len(self.inputs) == 1:
+            self._input[:] = signal[:, self.inputs[0]:self.inputs[0] + 1]
+        else:
+            self._input[:, 0] = signal[:, self.inputs[0]]
+            self._input[:, 1] = signal[:, self.inputs[1]]
+        return self._input
+
+    def process(self, signal, sample_rate):
+        return self.chain.process(self.gather(signal), sample_rate)
+
+class InputRouter:
+    """
+    Multi-input engine chain: one chain per input (or input pair), all processed in the same
+    audio callback, and a mixer that sums them into the output channels.
+
+    Routes whose chains are all native (pedalboard releases the GIL) run on their own BranchWorker
+    threads; routes with Python stages run on the audio thread. Exposes the CompiledChain interface,
+    so the engine runs it like any other chain: (samples, input_channels) in,
+    (samples, output_channels) out.
+    """
+    def __init__(self, routes: list, input_channels: int, output_channels: int, name: str = None):
+        for route in routes:
+            if max(route.inputs) >= input_channels or max(route.outputs) >= output_channels:
+                raise ValueError(f"Route {route.name} uses channels outside {input_channels} in / {output_channels} out")
+        self.routes = routes
+        self.input_channels = input_channels
+        self.output_channels = output_channels
+        self.name = name
+        self.profile_indices = None # CallbackProfiler rows, set when the chain is profiled
+        self._out = None
+
+        # Worker routes are started first, so they overlap with the ones on the audio thread.
+        # The audio thread always keeps at least one route instead of only waiting.
+        self._pooled = [route for route in routes if route.native]
+        self._inline = [route for route in routes if not route.native]
+        if not self._inline:
+            self._inline = self._pooled[:1]
+            self._pooled = self._pooled[1:]
+        self._workers = [BranchWorker(route.process, name=f"fx-route-{route.name}") for route in self._pooled]
+
+    @staticmethod
+    def from_config(routing: dict, presets: dict, group_native: bool = True, optimize: bool = False) -> "InputRouter":
+        """
+        Builds a router from a routing config (see fx_config.ROUTINGS). Every route gets its own
+        effect instances, even when two routes use the same preset. optimize runs every route's
+        chain through the ChainOptimizer.
+        """
+        routes = []
+        for spec in routing["routes"]:
+            config = spec["chain"] if "chain" in spec else presets[spec["preset"]][1]
+            name = spec.get("name")
+            print(f"🎸 Route {name or spec['inputs']}: inputs {spec['inputs']} -> outputs {spec.get('outputs', [0, 1])}")
+            effects = PluginManager.load_effect_chain(config)
+            if optimize:
+                effects = ChainOptimizer.optimize(effects)
+            chain = ChainCompiler.compile(effects, group_native=group_native, name=name)
+            routes.append(InputRoute(chain, spec["inputs"], spec.get("outputs", (0, 1)), spec.get("gain", 1.0),
+                                     spec.get("pan", 0.0), name))
+        return InputRouter(routes, routing["input_channels"], routing["output_channels"], name=routing.get("name"))
+
+    @property
+    def effects(self) -> list:
+        return [effect for route in self.routes for effect in route.chain.effects]
+
+    def bind(self, arena):
+        self._out = arena.block((id(self), "out"), channels=self.output_channels)
+        for route in self.routes:
+            route.bind(arena)
+
+    def reset(self):
+        for route in self.routes:
+            route.chain.reset()
+
+    def _mix(self, route, processed):
+        mixed = route._mixed
+        np.matmul(processed, route.matrix, out=mixed)
+        for column, channel in enumerate(route.outputs):
+            self._out[:, channel] += mixed[:, column]
+
+    def _output(self, frames):
+        if self._out is None or self._out.shape[0] != frames:
+            self._out = np.zeros((frames, self.output_channels), dtype=np.float32)
+        self._out.fill(0.0)
+        return self._out
+
+    def process(self, signal, sample_rate):
+        out = self._output(signal.shape[0])
+        for worker in self._workers:
+            worker.start(signal, sample_rate)
+        try:
+            for route in self._inline:
+                self._mix(route, route.process(signal, sample_rate))
+        finally:
+            # Collected even when an inline route raises, so no handoff is left over for the next block
+            for worker in self._workers:
+                worker.wait()
+        for route, worker in zip(self._pooled, self._workers):
+            self._mix(route, worker.result())
+        return out
+
+    def stage_labels(self) -> list:
+        # Route chains are compiled with the route name, so their labels already say which input they belong to
+        return [label for route in self.routes for label in route.chain.stage_labels()]
+
+    def process_profiled(self, signal, sample_rate, profiler):
+        """
+        Same as process(), but the routes run one after another so each stage can be timed on its own.
+        """
+        out = self._output(signal.shape[0])
+        offset = 0
+        for route in self.routes:
+            if route.chain.profile_indices is None:
+                count = len(route.chain.stages)
+                route.chain.profile_indices = self.profile_indices[offset:offset + count]
+            offset += len(route.chain.stages)
+            self._mix(route, route.chain.process_profiled(route.gather(signal), sample_rate, profiler))
+        return out
+
+    def process_checked(self, signal, sample_rate, guard):
+        out = self._output(signal.shape[0])
+        for route in self.routes:
+            self._mix(route, route.chain.process_checked(route.gather(signal), sample_rate, guard))
+        return out
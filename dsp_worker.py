@@ -0,0 +1,190 @@
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+# Control words at the start of the shared block
+_IN_COUNT = 0 # Blocks written by the audio callback so far
+_HEARTBEAT = 1 # Last time (ns) the worker finished a block
+_STOP = 2 # Set to 1 to ask the worker to exit
+_READY = 3 # Set to 1 by the worker once its chain is loaded
+_CONTROL_WORDS = 4
+
+def _attach(shm, slots, block_size, channels):
+    """
+    Maps the shared memory layout: control words, per-slot output tags, input slots, output slots.
+    """
+    control = np.ndarray((_CONTROL_WORDS,), dtype=np.int64, buffer=shm.buf)
+    tags = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=control.nbytes)
+    offset = control.nbytes + tags.nbytes
+    shape = (slots, block_size, channels)
+    inputs = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=offset)
+    outputs = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=offset + inputs.nbytes)
+    return control, tags, inputs, outputs
+
+def _shared_size(slots, block_size, channels):
+    return (_CONTROL_WORDS + slots) * 8 + 2 * slots * block_size * channels * 4
+
+def _worker_main(shm_name, slots, block_size, channels, plugin_config, sample_rate, wakeup):
+    """
+    Worker process: builds the chain and processes blocks as the audio callback publishes them.
+    """
+    # Imported here so only the worker process loads plugins
+    from chain_compiler import ChainCompiler # pylint: disable=import-outside-toplevel
+    from plugin_manager import PluginManager # pylint: disable=import-outside-toplevel
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    control, tags, inputs, outputs = _attach(shm, slots, block_size, channels)
+    chain = ChainCompiler.compile(PluginManager.load_effect_chain(plugin_config))
+    control[_READY] = 1
+
+    # Start from the newest block: anything older is already past its deadline
+    processed = int(control[_IN_COUNT])
+    try:
+        while not control[_STOP]:
+            wakeup.acquire(timeout=0.2)
+            available = int(control[_IN_COUNT])
+            if available - processed > slots:
+                processed = available - 1 # Fell too far behind: skip to the newest block
+
+            while processed < available:
+                slot = processed % slots
+                outputs[slot] = chain.process(inputs[slot], sample_rate)
+                tags[slot] = processed
+                processed += 1
+            control[_HEARTBEAT] = time.perf_counter_ns()
+    finally:
+        del control, tags, inputs, outputs
+        shm.close()
+
+class IsolatedChain:
+    """
+    Runs the effect chain in a separate worker process. Audio blocks are exchanged through
+    multiprocessing.shared_memory ring slots, so the audio callback only copies buffers and
+    a slow or crashing plugin cannot stall or take down the stream.
+
+    Output is delayed by `lookahead` blocks to give the worker time. If the worker has not
+    delivered a block in time, the dry (equally delayed) input is passed through instead, and
+    after `max_misses` consecutive misses (or if the worker died) a supervisor thread restarts it.
+
+    Used by PedalboardEngine in place of a CompiledChain.
+    """
+    def __init__(self, plugin_config: list, sample_rate: int, block_size: int, channels: int = 2,
+                 lookahead: int = 2, max_misses: int = 50, name: str = None):
+        self.plugin_config = plugin_config
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.channels = channels
+        self.lookahead = lookahead
+        self.slots = lookahead + 4
+        self.max_misses = max_misses
+        self.name = name
+
+        # CompiledChain interface: the effects live in the worker, not here
+        self.effects = []
+        self.stages = []
+        self.profile_indices = []
+
+        self._context = mp.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=_shared_size(self.slots, block_size, channels))
+        self._control, self._tags, self._inputs, self._outputs = _attach(self._shm, self.slots, block_size, channels)
+        self._control[:] = 0
+        self._tags[:] = -1
+        self._silence = np.zeros((block_size, channels), dtype=np.float32)
+        self._wakeup = self._context.Semaphore(0)
+        self._process = None
+        self._supervisor = None
+        self._running = False
+
+        # Stats
+        self.missed_blocks = 0
+        self.restarts = 0
+        self._consecutive_misses = 0
+        self._restart_requested = False
+
+    def _spawn_worker(self):
+        self._control[_STOP] = 0
+        self._control[_READY] = 0
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slots, self.block_size, self.channels,
+                  self.plugin_config, self.sample_rate, self._wakeup),
+            daemon=True
+        )
+        self._process.start()
+
+    def start(self):
+        print(f"🧱 Starting isolated DSP worker (lookahead {self.lookahead} blocks, "
+              f"+{self.lookahead * self.block_size / self.sample_rate * 1000:.1f} ms)...")
+        self._running = True
+        self._spawn_worker()
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def _supervise(self):
+        while self._running:
+            time.sleep(0.1)
+            if self._running and (self._restart_requested or not self._process.is_alive()):
+                print("⚠️ DSP worker missed its deadline or died: restarting (dry signal meanwhile)...")
+                self._stop_worker()
+                self.restarts += 1
+                self._consecutive_misses = 0
+                self._restart_requested = False
+                self._spawn_worker()
+
+    def _stop_worker(self):
+        self._control[_STOP] = 1
+        self._wakeup.release()
+        self._process.join(timeout=1.0)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+    def stop(self):
+        self._running = False
+        if self._supervisor:
+            self._supervisor.join()
+        if self._process:
+            self._stop_worker()
+        print(f"🧱 DSP worker stopped: {self.missed_blocks} blocks passed through dry, {self.restarts} restarts.")
+        del self._control, self._tags, self._inputs, self._outputs
+        self._shm.close()
+        self._shm.unlink()
+
+    def process(self, signal, _sample_rate):
+        """
+        Called from the audio callback: publishes this block and returns the block from
+        `lookahead` blocks ago (processed, or dry if the worker missed it).
+        """
+        block_index = int(self._control[_IN_COUNT])
+        self._inputs[block_index % self.slots] = signal
+        self._control[_IN_COUNT] = block_index + 1
+        if self._control[_READY]:
+            self._wakeup.release() # Nobody waits on it while plugins are still loading
+
+        wanted = block_index - self.lookahead
+        if wanted < 0:
+            return self._silence # Filling the lookahead
+        slot = wanted % self.slots
+        if self._tags[slot] == wanted:
+            self._consecutive_misses = 0
+            return self._outputs[slot]
+
+        # Missed: keep the timing consistent by passing the delayed dry block through
+        self.missed_blocks += 1
+        if self._control[_READY]:
+            # Only a loaded worker can be late; plugin loading is not a deadline miss
+            self._consecutive_misses += 1
+            if self._consecutive_misses > self.max_misses:
+                self._restart_requested = True
+        return self._inputs[slot]
+
+    def process_profiled(self, signal, sample_rate, _profiler):
+        return self.process(signal, sample_rate)
+
+    def stage_labels(self) -> list:
+        return []
+
+    def reset(self):
+        pass # The worker's state cannot be reset from here; restarting the worker resets it
@@ -2,11 +2,14 @@ class PluginConfig:
     """
     Encapsulates the configuration for a single plugin.
     """
-    def __init__(self, type_name: str, name: str = None, path: str = None, params: dict = None):
+    def __init__(self, type_name: str, name: str = None, path: str = None, params: dict = None,
+                 branches: list = None, oversample: int = None):
         self.type = type_name
         self.name = name
         self.path = path
         self.params = params if params else {}
+        self.branches = branches
+        self.oversample = oversample
 
     def to_dict(self):
         config = {"type": self.type, "params": self.params}
@@ -14,6 +17,14 @@ class PluginConfig:
             config["name"] = self.name
         if self.path:
             config["path"] = self.path
+        if self.oversample:
+            config["oversample"] = self.oversample
+        if self.branches is not None:
+            config["branches"] = [
+                dict(branch, chain=branch["chain"].get_config_list())
+                if isinstance(branch.get("chain"), PedalboardConfig) else branch
+                for branch in self.branches
+            ]
         return config
 
 class PedalboardConfig:
@@ -23,16 +34,23 @@ class PedalboardConfig:
     def __init__(self):
         self.chain = []
 
-    def add_internal(self, name: str, params: dict = None):
-        self.chain.append(PluginConfig("internal", name=name, params=params))
+    def add_internal(self, name: str, params: dict = None, oversample: int = None):
+        self.chain.append(PluginConfig("internal", name=name, params=params, oversample=oversample))
         return self
 
-    def add_vst3(self, path: str, params: dict = None):
-        self.chain.append(PluginConfig("vst3", path=path, params=params))
+    def add_vst3(self, path: str, params: dict = None, oversample: int = None):
+        self.chain.append(PluginConfig("vst3", path=path, params=params, oversample=oversample))
         return self
 
-    def add_custom(self, name: str, params: dict = None):
-        self.chain.append(PluginConfig("custom", name=name, params=params))
+    def add_custom(self, name: str, params: dict = None, oversample: int = None):
+        self.chain.append(PluginConfig("custom", name=name, params=params, oversample=oversample))
+        return self
+
+    def add_parallel(self, branches: list):
+        """
+        branches: [{"chain": PedalboardConfig or list, "mix": 1.0, "pan": 0.0, "input": "both"}, ...]
+        """
+        self.chain.append(PluginConfig("parallel", branches=branches))
         return self
 
     def get_config_list(self):
@@ -43,6 +61,7 @@ PLUGIN_CHAIN_CONFIG = [
 # PLUGIN_CHAIN_CONFIG_TurnOff = [
     # {"type": "custom", "name": "MyChorus", "params": {"depth_ms": 3.0, "speed_hz": 2.5, "mix": 0.5}},
     # {"type": "custom", "name": "MyShifter", "params": {"semitones": -12.0, "mix": 1.0}}, # Octave Down
+    # {"type": "custom", "name": "MyCabinet", "params": {"ir_path": "ir/cab_4x12.wav", "mix": 1.0}}, # Cabinet IR
     {"type": "internal", "name": "Compressor", "params": {"threshold_db": -12.0, "ratio": 2.5, "attack_ms": 10.0, "release_ms": 100.0}},
     {"type": "internal", "name": "Chorus", "params": {"rate_hz": 0.5, "depth": 0.15, "centre_delay_ms": 7.0, "feedback": 0.0, "mix": 0.3}},
     {"type": "internal", "name": "Reverb", "params": {"room_size": 0.3, "wet_level": 0.3, "dry_level": 1.0}},
@@ -68,7 +87,7 @@ PLUGIN_CHAIN_CONFIG_DEMO_CleanTone = [
 PLUGIN_CHAIN_CONFIG_DEMO_LeadGuitar = [
 # PLUGIN_CHAIN_CONFIG = [
     {"type": "internal", "name": "NoiseGate", "params": {"threshold_db": -50.0}},
-    {"type": "internal", "name": "Distortion", "params": {"drive_db": 30.0}}, # High gain
+    {"type": "internal", "name": "Distortion", "params": {"drive_db": 30.0}, "oversample": 4}, # High gain, 4x oversampled against aliasing
     {"type": "internal", "name": "Delay", "params": {"delay_seconds": 0.35, "feedback": 0.3, "mix": 0.4}},
     {"type": "internal", "name": "Reverb", "params": {"room_size": 0.1, "wet_level": 0.2}}, # Small room for tightness
     {"type": "internal", "name": "Gain", "params": {"gain_db": 2.0}},
@@ -89,7 +108,56 @@ PLUGIN_CHAIN_CONFIG_DEMO_SoloGuitar = [
 PLUGIN_CHAIN_CONFIG_DEMO_Crunch = [
 # PLUGIN_CHAIN_CONFIG = [
     {"type": "internal", "name": "Compressor", "params": {"threshold_db": -10.0, "ratio": 2.0}}, # Light glue
-    {"type": "internal", "name": "Distortion", "params": {"drive_db": 12.0}}, # Edge of breakup
+    {"type": "internal", "name": "Distortion", "params": {"drive_db": 12.0}, "oversample": 2}, # Edge of breakup, 2x oversampled
     {"type": "internal", "name": "Reverb", "params": {"room_size": 0.4, "wet_level": 0.25}},
     {"type": "internal", "name": "Gain", "params": {"gain_db": 0.0}},
 ]
+
+# 5. Ambient Solo: parallel wet bus
+# The dry amp path and the Delay + Reverb bus run side by side (on separate cores) and are
+# mixed back together, so the ambience never smears the attack of the dry signal.
+# A branch can also take a single input channel ("input": "left" / "right") for a stereo split.
+PLUGIN_CHAIN_CONFIG_DEMO_AmbientSolo = [
+    {"type": "internal", "name": "Compressor", "params": {"threshold_db": -15.0, "ratio": 4.0, "attack_ms": 5.0, "release_ms": 200.0}},
+    {"type": "internal", "name": "Distortion", "params": {"drive_db": 18.0}},
+    {"type": "parallel", "branches": [
+        {"chain": [], "mix": 1.0}, # Dry amp path
+        {"chain": [
+            {"type": "internal", "name": "Delay", "params": {"delay_seconds": 0.45, "feedback": 0.4, "mix": 1.0}},
+            {"type": "internal", "name": "Reverb", "params": {"room_size": 0.8, "wet_level": 1.0, "dry_level": 0.0}},
+        ], "mix": 0.4}, # Wet bus
+    ]},
+]
+
+# --------------------------------------------------------------------------------
+# Preset lookup used by the CLI (-p / --preset): key -> (label, chain config)
+# --------------------------------------------------------------------------------
+PRESETS = {
+    "a1": ("Clean Tone", PLUGIN_CHAIN_CONFIG_DEMO_CleanTone),
+    "a2": ("Lead Guitar", PLUGIN_CHAIN_CONFIG_DEMO_LeadGuitar),
+    "a3": ("Solo Guitar", PLUGIN_CHAIN_CONFIG_DEMO_SoloGuitar),
+    "a4": ("Crunch", PLUGIN_CHAIN_CONFIG_DEMO_Crunch),
+    "a5": ("Ambient Solo", PLUGIN_CHAIN_CONFIG_DEMO_AmbientSolo),
+}
+
+# --------------------------------------------------------------------------------
+# Multi-input routing used by the CLI (--routing): key -> (label, routing config)
+# One chain per input channel (or channel pair), mixed to the output channels.
+# Channel numbers start at 0. A route takes a preset key or its own "chain".
+# --------------------------------------------------------------------------------
+ROUTING_CONFIG_DEMO_Trio = {
+    "input_channels": 4,
+    "output_channels": 2,
+    "routes": [
+        {"name": "Guitar 1", "inputs": [0], "preset": "a4", "outputs": [0, 1], "pan": -0.4},
+        {"name": "Guitar 2", "inputs": [1], "preset": "a1", "outputs": [0, 1], "pan": 0.4},
+        {"name": "Bass", "inputs": [2], "outputs": [0, 1], "gain": 0.9, "chain": [
+            {"type": "internal", "name": "Compressor", "params": {"threshold_db": -18.0, "ratio": 4.0, "attack_ms": 5.0, "release_ms": 150.0}},
+            {"type": "internal", "name": "LowShelfFilter", "params": {"cutoff_frequency_hz": 120.0, "gain_db": 3.0}},
+        ]},
+    ],
+}
+
+ROUTINGS = {
+    "trio": ("Two guitars + bass", ROUTING_CONFIG_DEMO_Trio),
+}
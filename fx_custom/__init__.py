@@ -1,26 +1,98 @@
-import os
+import ast
 import importlib
-import inspect
-
-# Dynamic Import Logic
-# This scans the current directory for files starting with 'fx_', imports them,
-# and exposes their classes at the package level.
-# This way, adding a new fx file automatically makes it available via 'import fx_custom'.
-
-current_dir = os.path.dirname(__file__)
-
-for filename in os.listdir(current_dir):
-    if filename.startswith("fx_") and filename.endswith(".py"):
-        module_name = filename[:-3] # strip .py
-        
-        # Import the module
-        module = importlib.import_module(f".{module_name}", package=__name__)
-        
-        # Inspect module for classes
-        for name, obj in inspect.getmembers(module):
-             if inspect.isclass(obj) and obj.__module__ == module.__name__:
-                 # Export class to package namespace
-                 globals()[name] = obj
-
-# Clean up namespace
-del os, importlib, inspect, current_dir, filename
+import json
+import os
+
+# Lazy Registry
+# Every file starting with 'fx_' in this directory is an effect module, and its classes are
+# exposed at the package level ('fx_custom.MyChorus'). Instead of importing every module up front,
+# the files are parsed with `ast` into a manifest (class name, constructor signature), cached in
+# .fx_manifest.json and keyed by file mtime. A module is only imported when one of its classes is
+# first used, so startup costs a manifest read and a broken module only breaks its own effects.
+
+_DIR = os.path.dirname(__file__)
+_MANIFEST_PATH = os.path.join(_DIR, ".fx_manifest.json")
+_MANIFEST = {} # filename -> {"mtime": float, "classes": {class name: signature}}
+
+def _scan_file(path: str) -> dict:
+    """
+    Class names and constructor signatures of an fx_ module, read without importing it.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    classes = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        signature = ""
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                args = item.args
+                args.args = args.args[1:] # drop self
+                signature = ast.unparse(args)
+        classes[node.name] = signature
+    return classes
+
+def _load_manifest() -> dict:
+    if _MANIFEST:
+        return _MANIFEST
+
+    try:
+        with open(_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    changed = False
+    for filename in sorted(os.listdir(_DIR)):
+        if not (filename.startswith("fx_") and filename.endswith(".py")):
+            continue
+        mtime = os.path.getmtime(os.path.join(_DIR, filename))
+        entry = cached.get(filename)
+        if not entry or entry.get("mtime") != mtime:
+            try:
+                classes = _scan_file(os.path.join(_DIR, filename))
+            except (OSError, SyntaxError, ValueError) as e:
+                print(f"   ⚠️ fx_custom: cannot parse {filename}: {e}")
+                classes = {}
+            entry = {"mtime": mtime, "classes": classes}
+            changed = True
+        _MANIFEST[filename] = entry
+
+    if changed or set(cached) != set(_MANIFEST):
+        try:
+            with open(_MANIFEST_PATH, "w", encoding="utf-8") as f:
+                json.dump(_MANIFEST, f, indent=2)
+        except OSError:
+            pass # Read-only install: the manifest is simply rebuilt next time
+    return _MANIFEST
+
+def list_effects() -> dict:
+    """
+    Every custom effect as name -> {"module": ..., "signature": ...}, without importing anything.
+    """
+    effects = {}
+    for filename, entry in _load_manifest().items():
+        for name, signature in entry["classes"].items():
+            effects[name] = {"module": filename[:-3], "signature": signature}
+    return effects
+
+def __getattr__(name):
+    # Called only for names not yet in the package namespace: import the defining module on first use
+    effect = list_effects().get(name)
+    if effect is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        module = importlib.import_module(f".{effect['module']}", package=__name__)
+    except Exception as e: # pylint: disable=broad-except
+        # A broken module only takes down the effects it defines
+        raise ImportError(f"fx_custom.{effect['module']} failed to import: {e}") from e
+
+    obj = getattr(module, name)
+    globals()[name] = obj # Cache: later lookups no longer reach __getattr__
+    return obj
+
+def __dir__():
+    return sorted(set(globals()) | set(list_effects()))
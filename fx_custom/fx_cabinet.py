@@ -0,0 +1,226 @@
+import hashlib
+import os
+import numpy as np
+import pedalboard
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
+from mod_oversample import PolyphaseResampler
+
+class MyCabinet:
+    """
+    Speaker cabinet / impulse response loader with zero added latency.
+
+    The IR is split at `partition` samples:
+      - the head (first `partition` taps) runs as a direct-form FIR inside every block,
+      - the tail runs as uniformly partitioned FFT convolution (overlap-save, FFT size 2*partition,
+        frequency-domain delay line). A tail frame is only ready `partition` samples after its
+        input, which is exactly where the tail starts, so the two parts line up without delay.
+    Tail frames are computed every `partition` samples (every few engine blocks).
+
+    The IR is resampled to the engine rate and its head and tail spectra are cached on disk
+    (.ir_cache/, keyed by IR path, mtime, rate and partition), so reloads skip all preparation.
+    Without an ir_path a built-in generic closed-back cabinet response is used.
+    """
+    CACHE_DIR = ".ir_cache"
+    allocates = True # NumPy's FFT has no out= argument: each tail frame allocates its spectra
+    rebuild_params = ("ir_path", "partition", "max_seconds", "normalize") # Read once when the IR is prepared
+
+    def __init__(self, ir_path: str = None, mix: float = 1.0, gain_db: float = 0.0, partition: int = 128,
+                 max_seconds: float = 1.0, normalize: bool = True):
+        if ir_path is not None and not os.path.exists(ir_path):
+            raise ValueError(f"Impulse response not found: {ir_path}")
+        self.ir_path = ir_path
+        self.mix = mix
+        self.gain_db = gain_db
+        self.partition = partition
+        self.max_seconds = max_seconds
+        self.normalize = normalize
+        self.sample_rate = None # Engine rate the IR is prepared for (prepare() or first call)
+        self.tail_seconds = 0.0
+
+    def prepare(self, sample_rate: int, block_size: int, channels: int = 2):
+        self._build(sample_rate, block_size)
+
+    def _cache_path(self, sample_rate: int) -> str:
+        source = f"{os.path.abspath(self.ir_path)}|{os.path.getmtime(self.ir_path)}" if self.ir_path else "builtin"
+        key = f"{source}|{sample_rate}|{self.partition}|{self.max_seconds}|{self.normalize}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(self.ir_path))[0] if self.ir_path else "builtin"
+        return os.path.join(self.CACHE_DIR, f"{name}-{digest}.npz")
+
+    @staticmethod
+    def _builtin_ir(sample_rate: int) -> np.ndarray:
+        """
+        A generic 4x12 closed-back response, rendered at the engine rate: an impulse through a
+        low cut, the cabinet resonance, a presence bump and a steep speaker roll-off (50 ms).
+        """
+        impulse = np.zeros((2, int(sample_rate * 0.05)), dtype=np.float32)
+        impulse[:, 0] = 1.0
+        board = pedalboard.Pedalboard([
+            pedalboard.HighpassFilter(cutoff_frequency_hz=70.0), pedalboard.HighpassFilter(cutoff_frequency_hz=70.0),
+            pedalboard.PeakFilter(cutoff_frequency_hz=110.0, gain_db=4.0, q=1.2),
+            pedalboard.PeakFilter(cutoff_frequency_hz=2500.0, gain_db=4.0, q=1.0),
+            pedalboard.LowpassFilter(cutoff_frequency_hz=4500.0), pedalboard.LowpassFilter(cutoff_frequency_hz=4500.0),
+            pedalboard.LowpassFilter(cutoff_frequency_hz=4500.0),
+        ])
+        return np.ascontiguousarray(board(impulse, sample_rate).T)
+
+    def _load_ir(self, sample_rate: int):
+        """
+        Reads the IR as stereo float32 at the engine rate, trimmed to max_seconds.
+        """
+        if self.ir_path is None:
+            ir, ir_rate = self._builtin_ir(sample_rate), sample_rate
+        else:
+            ir, ir_rate = sf.read(self.ir_path, dtype="float32", always_2d=True)
+        ir = ir[:, :2] if ir.shape[1] >= 2 else np.repeat(ir, 2, axis=1)
+        ir = ir[:int(ir_rate * self.max_seconds)]
+
+        if ir_rate != sample_rate:
+            resampler = PolyphaseResampler(sample_rate, ir_rate)
+            # Flush the filter with zeros and drop its delay, so the IR stays aligned
+            padded = np.concatenate([ir, np.zeros((resampler.taps, 2), dtype=np.float32)])
+            resampled = np.concatenate([resampler.process(padded[start:start + resampler.max_block]).copy()
+                                        for start in range(0, len(padded), resampler.max_block)])
+            delay = int(round(resampler.delay_output))
+            ir = resampled[delay:delay + int(round(len(ir) * sample_rate / ir_rate))].copy()
+
+        if self.normalize:
+            # Unit energy per channel keeps different IRs at a similar loudness
+            ir /= np.maximum(np.sqrt(np.sum(ir ** 2, axis=0)), 1e-9)
+        return ir
+
+    def _build(self, sample_rate: int, block_size: int = 0):
+        """
+        Prepares head taps and tail spectra (from the disk cache when possible) and resets the state.
+        """
+        size = self.partition
+        cache_path = self._cache_path(sample_rate)
+        try:
+            cached = np.load(cache_path)
+            head, tail, length = cached["head"], cached["tail"], int(cached["length"])
+        except (OSError, KeyError, ValueError):
+            ir = self._load_ir(sample_rate)
+            length = len(ir)
+            head = np.zeros((size, 2), dtype=np.float32)
+            head[:min(size, length)] = ir[:size]
+
+            # Tail partitions of `size` samples, zero-padded to 2*size (overlap-save)
+            parts = max(0, -(-(length - size) // size))
+            tail_ir = np.zeros((parts * size, 2), dtype=np.float32)
+            tail_ir[:max(0, length - size)] = ir[size:]
+            padded = np.zeros((parts, 2 * size, 2), dtype=np.float32)
+            padded[:, :size] = tail_ir.reshape(parts, size, 2)
+            tail = np.fft.rfft(padded, axis=1).astype(np.complex64)
+
+            try:
+                os.makedirs(self.CACHE_DIR, exist_ok=True)
+                np.savez(cache_path, head=head, tail=tail, length=length)
+            except OSError as e:
+                print(f"   ⚠️ Could not cache IR spectra: {e}")
+
+        self.sample_rate = sample_rate
+        self.tail_seconds = length / sample_rate
+
+        # Head: direct form over a sliding window of the last `size` input frames
+        self._head = np.ascontiguousarray(head[::-1].T) # (channels, taps), reversed for the window order
+        self._max_block = max(block_size, size)
+        self._history = np.zeros((size - 1 + self._max_block, 2), dtype=np.float32)
+        self._windows = sliding_window_view(self._history, size, axis=0)
+        self._wet = np.zeros((self._max_block, 2), dtype=np.float32)
+
+        # Tail: frequency-domain delay line (ring of input spectra) and overlap-save buffers
+        self._tail = tail
+        parts = tail.shape[0]
+        self._fdl = np.zeros_like(tail)
+        self._product = np.zeros_like(tail)
+        self._acc = np.zeros(tail.shape[1:], dtype=np.complex64)
+        self._fdl_pos = 0
+        self._frame = np.zeros((2 * size, 2), dtype=np.float32) # previous + current input frame
+        self._fill = 0 # Frames written into the current input frame
+        self._tail_out = np.zeros((size, 2), dtype=np.float32) # Tail output for the next `size` samples
+        self._has_tail = parts > 0
+        self._out = None
+
+    def reset(self):
+        if self.sample_rate is None:
+            return
+        self._history.fill(0.0)
+        self._fdl.fill(0.0)
+        self._frame.fill(0.0)
+        self._tail_out.fill(0.0)
+        self._fill = 0
+        self._fdl_pos = 0
+
+    def _process_tail_frame(self):
+        """
+        A full input frame arrived: push its spectrum into the delay line and compute
+        the tail output for the next `partition` samples.
+        """
+        size = self.partition
+        parts = self._tail.shape[0]
+        self._fdl_pos = (self._fdl_pos + 1) % parts
+        pos = self._fdl_pos
+        self._fdl[pos] = np.fft.rfft(self._frame, axis=0)
+
+        # acc = sum_j H[j] * X[t - j]; the ring is read newest-first in two slices
+        np.multiply(self._tail[:pos + 1], self._fdl[pos::-1], out=self._product[:pos + 1])
+        if pos + 1 < parts:
+            np.multiply(self._tail[pos + 1:], self._fdl[:pos:-1], out=self._product[pos + 1:])
+        np.sum(self._product, axis=0, out=self._acc)
+        self._tail_out[:] = np.fft.irfft(self._acc, n=2 * size, axis=0)[size:]
+
+        # Current frame becomes the previous one
+        self._frame[:size] = self._frame[size:]
+
+    def __call__(self, input_array, sample_rate):
+        # input_array shape: (num_samples, channels)
+        if sample_rate != self.sample_rate or input_array.shape[0] > self._max_block:
+            self._build(sample_rate, input_array.shape[0]) # Not expected while streaming: prepare() did it
+        if self._out is None or self._out.shape != input_array.shape:
+            self._out = np.empty(input_array.shape, dtype=np.float32)
+        self.process(input_array, self._out)
+        return self._out
+
+    def process(self, in_buf, out_buf):
+        """
+        In-place protocol: convolves in_buf into out_buf (float32 blocks, prepared sample rate).
+        Blocks larger than the one given to prepare() run in chunks of the prepared size.
+        """
+        num_samples = in_buf.shape[0]
+        if num_samples <= self._max_block:
+            self._process_block(in_buf, out_buf)
+            return
+        for start in range(0, num_samples, self._max_block):
+            end = min(start + self._max_block, num_samples)
+            self._process_block(in_buf[start:end], out_buf[start:end])
+
+    def _process_block(self, in_buf, out_buf):
+        num_samples = in_buf.shape[0]
+        size = self.partition
+        history_len = size - 1
+
+        # 1. Head (direct form)
+        self._history[history_len:history_len + num_samples] = in_buf
+        wet = self._wet[:num_samples]
+        np.einsum("nck,ck->nc", self._windows[:num_samples], self._head, out=wet)
+        self._history[:history_len] = self._history[num_samples:num_samples + history_len]
+
+        # 2. Tail: add the precomputed tail output, feed the input frame, chunked at frame boundaries
+        if self._has_tail:
+            start = 0
+            while start < num_samples:
+                count = min(num_samples - start, size - self._fill)
+                wet[start:start + count] += self._tail_out[self._fill:self._fill + count]
+                self._frame[size + self._fill:size + self._fill + count] = in_buf[start:start + count]
+                self._fill += count
+                start += count
+                if self._fill == size:
+                    self._fill = 0
+                    self._process_tail_frame()
+
+        # 3. Mix
+        gain = 10.0 ** (self.gain_db / 20.0)
+        np.multiply(in_buf, 1.0 - self.mix, out=out_buf)
+        wet *= self.mix * gain
+        out_buf += wet
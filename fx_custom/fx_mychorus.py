@@ -1,56 +1,246 @@
+import math
 import numpy as np
+from .kernel import INTERPOLATION, KernelEffect, jit, read_interpolated
 
-class MyChorus:
+@jit
+def _chorus_kernel(block, out, buffer, write_ptr, phase, omega, delay_base, delay_depth, mode, mix_start, mix_step):
+    """
+    Per-sample chorus: write, modulated fractional read, mix. Returns the new write pointer.
+    Delays are in samples; mix for sample i is mix_start + mix_step * (i + 1).
+    """
+    size = buffer.shape[0]
+    for i in range(block.shape[0]):
+        for c in range(2):
+            buffer[write_ptr, c] = block[i, c]
+
+        delay = max(delay_base + delay_depth * math.sin(phase + omega * i), 2.0)
+        pos = write_ptr - delay
+        if mode == 0:
+            pos = float(int(pos)) # Truncate toward zero like the original int() read
+        mix = mix_start + mix_step * (i + 1)
+        for c in range(2):
+            wet = read_interpolated(buffer, pos, c, mode)
+            out[i, c] = block[i, c] + (wet - block[i, c]) * mix
+
+        write_ptr += 1
+        if write_ptr == size:
+            write_ptr = 0
+    return write_ptr
+
+class MyChorus(KernelEffect):
     """
     A simple Python implementation of a Vibrato/Chorus effect.
     Uses a circular buffer to create a modulated delay.
+
+    Processing is block-vectorized: the LFO is evaluated for a whole chunk at once,
+    the circular buffer is written with slice copies and the modulated taps are read
+    with fractional-delay interpolation ("none", "linear" or "cubic").
+    All scratch arrays are allocated in __init__, so the audio callback does not allocate
+    (apart from the output block, which is allocated once and then reused).
+
+    With numba installed the same algorithm runs as a compiled per-sample kernel
+    (see fx_custom/kernel.py); the NumPy path is the fallback.
     """
-    def __init__(self, depth_ms=2.0, speed_hz=2.0, mix=0.5):
+    BASE_DELAY_MS = 5.0
+    CHUNK_SIZE = 256 # Max samples processed per vectorized pass (scratch array length)
+    rebuild_params = ("interpolation", "use_jit") # Only read by the constructor (config hot-reload)
+
+    def __init__(self, depth_ms=2.0, speed_hz=2.0, mix=0.5, interpolation="linear", use_jit=True):
+        if interpolation not in ("none", "linear", "cubic"):
+            raise ValueError(f"Unknown interpolation mode: {interpolation}")
+        super().__init__(use_jit)
+
         self.depth_ms = depth_ms
         self.speed_hz = speed_hz
         self.mix = mix
+        self.interpolation = interpolation
 
-        # Buffer setup (assuming 32000Hz or standard rate)
-        # We don't have global SAMPLE_RATE here, so we might need it passed in __call__
-        # or initialized better. For now, we assume calling context handles state,
-        # but standard DSP classes usually need explicit sample rate in init or call.
-        # The design in main.py passes sample_rate to __call__, so we rely on that for calculations,
-        # but buffer allocation needs a max size.
-        # Let's allocate liberally for 48kHz to be safe.
+        # Buffer setup: the sample rate is only known in __call__,
+        # so we allocate liberally for 48kHz to be safe.
         self.max_sample_rate = 48000
         self.buffer_size = int(self.max_sample_rate * 0.05)
-        self.buffer = np.zeros((self.buffer_size, 2)) # Stereo
+        self.buffer = np.zeros((self.buffer_size, 2), dtype=np.float32) # Stereo
+        self.write_ptr = 0
+        self.phase = 0.0 # LFO phase in radians, kept wrapped to [0, 2*pi)
+
+        # Scratch arrays (one vectorized chunk)
+        chunk = self.CHUNK_SIZE
+        self._ramp = np.arange(chunk, dtype=np.float64)
+        self._lfo = np.empty(chunk)
+        self._pos = np.empty(chunk)
+        self._frac = np.empty((chunk, 1), dtype=np.float32)
+        self._idx = np.empty(chunk, dtype=np.int64)
+        self._mask = np.empty(chunk, dtype=bool)
+        self._taps = np.empty((4, chunk, 2), dtype=np.float32)
+        self._tmp = np.empty((chunk, 2), dtype=np.float32)
+        self._wet = np.empty((chunk, 2), dtype=np.float32)
+        self._mix = np.empty((chunk, 1), dtype=np.float32)
+        self._mix_ramp = None # (start, end) over the next block, see set_ramp()
+
+    @property
+    def tail_seconds(self):
+        # Longest modulated delay: the buffer still holds this much after the input stops
+        return (self.BASE_DELAY_MS + self.depth_ms) / 1000.0
+
+    def set_ramp(self, name, start, end):
+        """
+        Parameter automation hook: `mix` glides per sample from start to end over the next block,
+        anything else is set once per block.
+        """
+        if name == "mix":
+            self._mix_ramp = (start, end)
+        setattr(self, name, end)
+
+    def reset(self):
+        self.buffer.fill(0.0)
         self.write_ptr = 0
         self.phase = 0.0
 
-    def __call__(self, input_array, sample_rate):
-        # input_array shape: (num_samples, channels)
+    def _process_kernel(self, input_array, out, sample_rate):
+        num_samples = input_array.shape[0]
+        if self._mix_ramp is None:
+            mix_start, mix_step = self.mix, 0.0
+        else:
+            mix_start, mix_end = self._mix_ramp
+            mix_step = (mix_end - mix_start) / num_samples
+            self._mix_ramp = None
+
+        omega = 2 * np.pi * self.speed_hz / sample_rate
+        self.write_ptr = _chorus_kernel(
+            input_array, out, self.buffer, self.write_ptr, self.phase, omega,
+            self.BASE_DELAY_MS * sample_rate / 1000.0, self.depth_ms * sample_rate / 1000.0,
+            INTERPOLATION[self.interpolation], mix_start, mix_step
+        )
+        self.phase = (self.phase + omega * num_samples) % (2 * np.pi)
+
+    def _process_numpy(self, input_array, out, sample_rate):
         num_samples = input_array.shape[0]
-        output_array = np.zeros_like(input_array)
+        start = 0
+        while start < num_samples:
+            end = min(start + self.CHUNK_SIZE, num_samples)
+            self._process_chunk(input_array[start:end], out[start:end], sample_rate, start, num_samples)
+            start = end
+
+        self._mix_ramp = None
+
+    def _process_chunk(self, block, out, sample_rate, offset=0, total=None):
+        n = block.shape[0]
+        size = self.buffer_size
+
+        # 1. Write to buffer (at most two slice copies when wrapping)
+        first = min(n, size - self.write_ptr)
+        self.buffer[self.write_ptr:self.write_ptr + first] = block[:first]
+        if first < n:
+            self.buffer[:n - first] = block[first:]
+
+        # 2. LFO for the whole chunk
+        omega = 2 * np.pi * self.speed_hz / sample_rate
+        lfo = self._lfo[:n]
+        np.multiply(self._ramp[:n], omega, out=lfo)
+        lfo += self.phase
+        np.sin(lfo, out=lfo)
+
+        # 3. Read position = (wrapped write index) - delay in samples
+        # Delay is clamped to 2 samples so the cubic taps never read the future.
+        pos = self._pos[:n]
+        np.multiply(lfo, self.depth_ms, out=pos)
+        pos += self.BASE_DELAY_MS
+        pos *= sample_rate / 1000.0
+        np.maximum(pos, 2.0, out=pos)
+        np.subtract(self._ramp[:n], pos, out=pos)
+        pos += self.write_ptr
+        if self.write_ptr + n > size:
+            # Match the per-sample pointer wrap of the original implementation
+            mask = self._mask[:n]
+            np.greater_equal(self._ramp[:n], size - self.write_ptr, out=mask)
+            np.subtract(pos, size, out=pos, where=mask)
+
+        wet = self._wet[:n]
+        if self.interpolation == "none":
+            self._read_nearest(pos, wet)
+        elif self.interpolation == "linear":
+            self._read_linear(pos, wet)
+        else:
+            self._read_cubic(pos, wet)
+
+        # 4. Mix dry and wet
+        if self._mix_ramp is None:
+            np.multiply(block, 1 - self.mix, out=out)
+            wet *= self.mix
+            out += wet
+        else:
+            # Per-sample mix while automated: out = dry + (wet - dry) * mix[i]
+            mix_start, mix_end = self._mix_ramp
+            mix = self._mix[:n]
+            slope = (mix_end - mix_start) / total
+            np.multiply(self._ramp[:n, np.newaxis], slope, out=mix)
+            mix += mix_start + slope * (offset + 1)
+            wet -= block
+            wet *= mix
+            np.add(block, wet, out=out)
+
+        # 5. Advance pointers
+        self.write_ptr = (self.write_ptr + n) % size
+        self.phase = (self.phase + omega * n) % (2 * np.pi)
 
-        for i in range(num_samples):
-            # Write to buffer
-            self.buffer[self.write_ptr] = input_array[i]
+    def _read_nearest(self, pos, wet):
+        # Truncate toward zero like int(), then wrap into the buffer
+        idx = self._idx[:pos.shape[0]]
+        np.trunc(pos, out=pos)
+        idx[:] = pos
+        np.take(self.buffer, idx, axis=0, out=wet, mode='wrap')
 
-            # Calculate LFO (Low Frequency Oscillator)
-            t = self.phase / sample_rate
-            lfo = np.sin(2 * np.pi * self.speed_hz * t)
+    def _split_position(self, pos):
+        n = pos.shape[0]
+        idx = self._idx[:n]
+        frac = self._frac[:n, 0]
+        np.floor(pos, out=frac)
+        idx[:] = frac
+        np.subtract(pos, frac, out=frac)
+        return idx, self._frac[:n]
 
-            # Calculate delay in samples
-            delay_ms = 5.0 + (lfo * self.depth_ms) # Base delay 5ms + modulation
-            delay_samples = delay_ms * (sample_rate / 1000.0)
+    def _read_linear(self, pos, wet):
+        n = pos.shape[0]
+        idx, frac = self._split_position(pos)
+        p0, p1 = self._taps[0, :n], self._taps[1, :n]
+        np.take(self.buffer, idx, axis=0, out=p0, mode='wrap')
+        idx += 1
+        np.take(self.buffer, idx, axis=0, out=p1, mode='wrap')
 
-            # Read from buffer (Linear Interpolation could be added for quality)
-            # Here we just round to nearest integer for speed
-            read_ptr = int(self.write_ptr - delay_samples) % self.buffer_size
+        # wet = p0 + frac * (p1 - p0)
+        np.subtract(p1, p0, out=wet)
+        wet *= frac
+        wet += p0
 
-            wet_signal = self.buffer[read_ptr]
+    def _read_cubic(self, pos, wet):
+        n = pos.shape[0]
+        idx, frac = self._split_position(pos)
+        idx -= 1
+        for k in range(4):
+            np.take(self.buffer, idx, axis=0, out=self._taps[k, :n], mode='wrap')
+            idx += 1
+        p0, p1, p2, p3 = self._taps[0, :n], self._taps[1, :n], self._taps[2, :n], self._taps[3, :n]
+        tmp = self._tmp[:n]
 
-            # Mix dry and wet
-            output_array[i] = (input_array[i] * (1 - self.mix)) + (wet_signal * self.mix)
+        # Catmull-Rom spline (Horner form):
+        # y = p1 + 0.5*f*(p2 - p0 + f*(2p0 - 5p1 + 4p2 - p3 + f*(3(p1 - p2) + p3 - p0)))
+        np.subtract(p1, p2, out=wet)
+        wet *= 3.0
+        wet += p3
+        wet -= p0
+        wet *= frac
 
-            # Advance pointers
-            self.write_ptr = (self.write_ptr + 1) % self.buffer_size
-            self.phase += 1
+        np.multiply(p0, 2.0, out=tmp)
+        wet += tmp
+        np.multiply(p1, 5.0, out=tmp)
+        wet -= tmp
+        np.multiply(p2, 4.0, out=tmp)
+        wet += tmp
+        wet -= p3
+        wet *= frac
 
-        return output_array
+        wet += p2
+        wet -= p0
+        wet *= frac
+        wet *= 0.5
+        wet += p1
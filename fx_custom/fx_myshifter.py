@@ -1,121 +1,316 @@
 import numpy as np
+from .kernel import INTERPOLATION, KernelEffect, jit, read_interpolated
 
-class MyShifter:
+@jit
+def _shifter_kernel(block, out, buffer, write_ptr, phase, phase_step, window_len, min_delay, mode,
+                    mix_start, mix_step):
+    """
+    Per-sample shifter: write, two triangle-windowed taps 180 deg apart, mix.
+    Returns the new write pointer; mix for sample i is mix_start + mix_step * (i + 1).
+    """
+    size = buffer.shape[0]
+    for i in range(block.shape[0]):
+        for c in range(2):
+            buffer[write_ptr, c] = block[i, c]
+
+        mix = mix_start + mix_step * (i + 1)
+        tap_phase = (phase + phase_step * i) % 1.0
+        for c in range(2):
+            out[i, c] = block[i, c] * (1.0 - mix)
+
+        for _ in range(2):
+            pos = write_ptr - min_delay - tap_phase * window_len
+            gain = 1.0 - 2.0 * abs(tap_phase - 0.5)
+            for c in range(2):
+                out[i, c] += read_interpolated(buffer, pos, c, mode) * gain * mix
+            tap_phase += 0.5
+            if tap_phase >= 1.0:
+                tap_phase -= 1.0
+
+        write_ptr += 1
+        if write_ptr == size:
+            write_ptr = 0
+    return write_ptr
+
+class MyShifter(KernelEffect):
     """
     A low-latency Time-Domain Granular Pitch Shifter.
     Uses a dual-tap modulated delay line approach to shift pitch in real-time
     without the high latency or block-size constraints of FFT-based shifters.
+
+    Processing is block-vectorized: the circular buffer is written with slice copies,
+    both taps are read with fractional-delay interpolation ("none", "linear" or "lagrange")
+    and all scratch arrays are allocated up front, so the audio callback does not allocate.
+    Window length and delay rate are only recomputed when `semitones`, `window_ms`
+    or the sample rate change. The buffer is sized for MAX_WINDOW_MS up front (like MyChorus),
+    so `window_ms` can be changed live without reallocating; it is clamped to that maximum.
+
+    With numba installed the same algorithm runs as a compiled per-sample kernel
+    (see fx_custom/kernel.py); the NumPy path is the fallback.
     """
-    def __init__(self, semitones: float = -12.0, mix: float = 1.0, window_ms: float = 30.0):
+    CHUNK_SIZE = 256 # Max samples processed per vectorized pass (scratch array length)
+    MIN_DELAY = 2 # Samples; keeps the interpolation taps behind the write pointer
+    MAX_WINDOW_MS = 100.0 # Longest window the buffer is sized for
+    rebuild_params = ("sample_rate", "interpolation", "use_jit") # Only read by the constructor (config hot-reload)
+
+    def __init__(self, semitones: float = -12.0, mix: float = 1.0, window_ms: float = 30.0,
+                 sample_rate: int = 48000, interpolation: str = "linear", use_jit: bool = True):
+        if interpolation not in ("none", "linear", "lagrange"):
+            raise ValueError(f"Unknown interpolation mode: {interpolation}")
+        super().__init__(use_jit)
+
         self.semitones = semitones
         self.mix = mix
-        
-        # Audio Engine params (assumed constant for allocation)
-        # We'll adapt in __call__ if sample_rate changes, but init needs a guess
-        self.max_buffer_size = 16000 # Enough for generous window
-        self.buffer = np.zeros((self.max_buffer_size, 2))
-        self.write_ptr = 0
-        
-        # Shifter State
         self.window_ms = window_ms
+        self.sample_rate = sample_rate
+        self.interpolation = interpolation
+
+        # Shifter State
+        self.buffer = None
+        self.buffer_size = 0
+        self.write_ptr = 0
         self.phase = 0.0 # 0.0 to 1.0, tracking the delay sweep position
-        
-        # Pre-calc
-        self._update_params(semitones)
 
-    def _update_params(self, semitones):
+        # Derived parameters, see _update_params()
+        self.current_semitones = None
+        self._current_window_ms = None
+        self._allocate(sample_rate)
+        self._update_params(sample_rate)
+
+        # Scratch arrays (one vectorized chunk)
+        chunk = self.CHUNK_SIZE
+        self._ramp = np.arange(chunk, dtype=np.float64)
+        self._phase = np.empty(chunk)
+        self._gain = np.empty((chunk, 1), dtype=np.float32)
+        self._pos = np.empty(chunk)
+        self._frac = np.empty((chunk, 1), dtype=np.float32)
+        self._coef = np.empty((4, chunk, 1), dtype=np.float32)
+        self._work = np.empty((3, chunk, 1), dtype=np.float32)
+        self._idx = np.empty(chunk, dtype=np.int64)
+        self._taps = np.empty((4, chunk, 2), dtype=np.float32)
+        self._tap = np.empty((chunk, 2), dtype=np.float32)
+        self._wet = np.empty((chunk, 2), dtype=np.float32)
+        self._mix = np.empty((chunk, 1), dtype=np.float32)
+        self._mix_ramp = None # (start, end) over the next block, see set_ramp()
+
+    @property
+    def tail_seconds(self):
+        # Longest delay swept by the taps
+        return self.window_ms / 1000.0
+
+    @property
+    def latency_samples(self):
+        # Both taps sweep min_delay -> min_delay + window under a triangle window peaking half way
+        return self.MIN_DELAY + self.window_len / 2.0
+
+    def set_ramp(self, name, start, end):
+        """
+        Parameter automation hook: `mix` glides per sample from start to end over the next block,
+        anything else (e.g. `semitones`) is set once per block.
+        """
+        if name == "mix":
+            self._mix_ramp = (start, end)
+        setattr(self, name, end)
+
+    def _update_params(self, sample_rate):
         # Ratio = 2^(semitones/12)
         # Delay Rate = 1.0 - Ratio
         # If Ratio = 0.5 (-12st), Rate = 0.5 (Delay grows 0.5 samp/samp)
         # If Ratio = 2.0 (+12st), Rate = -1.0 (Delay shrinks 1 samp/samp)
-        self.pitch_ratio = 2.0 ** (semitones / 12.0)
+        self.pitch_ratio = 2.0 ** (self.semitones / 12.0)
         self.delay_rate = 1.0 - self.pitch_ratio
 
+        # The delay sweeps 0 -> window_len, so the normalized phase advances delay_rate / window_len
+        window_ms = min(self.window_ms, self.MAX_WINDOW_MS) # The buffer holds no longer window
+        self.window_len = max(1, int(sample_rate * (window_ms / 1000.0)))
+        self.phase_step = self.delay_rate / self.window_len
+
+        self.sample_rate = sample_rate
+        self.current_semitones = self.semitones
+        self._current_window_ms = self.window_ms
+
+    def _allocate(self, sample_rate):
+        # Longest read: max window + min delay + one chunk + the Lagrange taps.
+        # Only called for a new sample rate (constructor, prepare(), offline calls), never from process()
+        needed = int(sample_rate * self.MAX_WINDOW_MS / 1000.0) + self.MIN_DELAY + self.CHUNK_SIZE + 4
+        if needed > self.buffer_size:
+            self.buffer = np.zeros((needed, 2), dtype=np.float32)
+            self.buffer_size = needed
+            self.write_ptr = 0
+
+    def reset(self):
+        self.buffer.fill(0.0)
+        self.write_ptr = 0
+        self.phase = 0.0
+
+    def prepare(self, sample_rate: int, block_size: int, channels: int = 2):
+        # Size the buffer for the engine rate now rather than on the first callback
+        self._allocate(sample_rate)
+        self._update_params(sample_rate)
+        super().prepare(sample_rate, block_size, channels)
+
+    def process(self, in_buf, out_buf):
+        # 1. Update params if needed (semitones can be automated while running)
+        if self.current_semitones != self.semitones or self._current_window_ms != self.window_ms:
+            self._update_params(self.sample_rate)
+        super().process(in_buf, out_buf)
+
     def __call__(self, input_array, sample_rate):
         # input_array: (block_size, channels)
+        if self.sample_rate != sample_rate:
+            self._allocate(sample_rate)
+            self._update_params(sample_rate)
+        return super().__call__(input_array, sample_rate)
+
+    def _process_kernel(self, input_array, out, sample_rate):
         num_samples = input_array.shape[0]
-        channels = input_array.shape[1]
-        
-        # 1. Update params if needed (could be dynamic later)
-        if hasattr(self, 'current_semitones') and self.current_semitones != self.semitones:
-             self._update_params(self.semitones)
-             self.current_semitones = self.semitones
-        
-        # 2. Manage Window
-        window_len = int(sample_rate * (self.window_ms / 1000.0))
-        if window_len < 1: window_len = 1
-        half_window = window_len / 2.0
-        
-        # 3. Write to circular buffer
-        # For simplicity in python, we might just write sequentially and wrap indices later
-        indices = np.arange(num_samples) + self.write_ptr
-        wrapped_indices = indices % self.max_buffer_size
-        
-        # Handle wrap-around writing (split into two chunks if needed)
-        # But numpy fancy indexing handles this if we just pass a list of indices? 
-        # Actually standard fancy indexing allocates a copy.
-        # Direct assignment is faster:
-        # We can just iterate or use robust slicing. Given small blocks (32), 
-        # it rarely wraps.
-        for i in range(num_samples):
-             self.buffer[(self.write_ptr + i) % self.max_buffer_size] = input_array[i]
-             
-        # 4. Calculate Delay Trajectories
-        # Phase runs 0->1. We map this to 0->WindowLen
-        # We need a vector of phases for the block
-        # phase_step per sample = delay_rate / window_len ?
-        # No.
-        # Delay(t) increases by `delay_rate` every sample.
-        # When Delay > WindowLen, it wraps.
-        # So Normalized Phase step = delay_rate / window_len
-        
-        phase_step = self.delay_rate / window_len
-        
-        # Vector of phases for this block
-        phases = self.phase + np.arange(num_samples) * phase_step
-        
-        # Update state for next block (keep it wrapped 0-1)
-        self.phase = (phases[-1] + phase_step) % 1.0
-        
-        # Wrap phases for calculations
-        phases = phases % 1.0
-        
-        # Tap 1 and Tap 2 (180 deg out of phase)
-        # Delays in Samples
-        delay_1 = phases * window_len
-        delay_2 = (phases + 0.5) % 1.0 * window_len
-        
-        # Windowing Gain (Triangle window)
-        # Gain is 1.0 at center (phase 0.5), 0.0 at edges (phase 0.0/1.0)
-        # Triangle: 1 - 2*|phase - 0.5|
-        gain_1 = 1.0 - 2.0 * np.abs(phases - 0.5)
-        gain_2 = 1.0 - 2.0 * np.abs((phases + 0.5) % 1.0 - 0.5)
-        
-        # 5. Read from Buffer
-        # write_ptr points to "now" (or rather, the index we just wrote to is write_ptr + i)
-        # Read Index = Write Index - Delay
-        # Since we vectorized the write, the "current write index" for sample i is (start_write + i)
-        
-        current_write_indices = (self.write_ptr + np.arange(num_samples))
-        
-        # Read Indices
-        r_idx_1 = (current_write_indices - delay_1) % self.max_buffer_size
-        r_idx_2 = (current_write_indices - delay_2) % self.max_buffer_size
-        
-        # Nearest Neighbor Interpolation (floor)
-        r_idx_1 = r_idx_1.astype(int)
-        r_idx_2 = r_idx_2.astype(int)
-        
-        signal_1 = self.buffer[r_idx_1] # (num_samples, 2)
-        signal_2 = self.buffer[r_idx_2]
-        
-        # Apply Gains (broadcast over channels)
-        wet_signal = (signal_1 * gain_1[:, np.newaxis]) + (signal_2 * gain_2[:, np.newaxis])
-        
-        # 6. Mix
-        output_array = (input_array * (1.0 - self.mix)) + (wet_signal * self.mix)
-        
-        # Advance Write Ptr
-        self.write_ptr = (self.write_ptr + num_samples) % self.max_buffer_size
-        
-        return output_array
+        if self._mix_ramp is None:
+            mix_start, mix_step = self.mix, 0.0
+        else:
+            mix_start, mix_end = self._mix_ramp
+            mix_step = (mix_end - mix_start) / num_samples
+            self._mix_ramp = None
+
+        self.write_ptr = _shifter_kernel(
+            input_array, out, self.buffer, self.write_ptr, self.phase, self.phase_step,
+            float(self.window_len), float(self.MIN_DELAY), INTERPOLATION[self.interpolation], mix_start, mix_step
+        )
+        self.phase = (self.phase + self.phase_step * num_samples) % 1.0
+
+    def _process_numpy(self, input_array, out, sample_rate):
+        num_samples = input_array.shape[0]
+        start = 0
+        while start < num_samples:
+            end = min(start + self.CHUNK_SIZE, num_samples)
+            self._process_chunk(input_array[start:end], out[start:end], start, num_samples)
+            start = end
+
+        self._mix_ramp = None
+
+    def _process_chunk(self, block, out, offset=0, total=None):
+        n = block.shape[0]
+        size = self.buffer_size
+
+        # 2. Write to circular buffer (at most two slice copies when wrapping)
+        first = min(n, size - self.write_ptr)
+        self.buffer[self.write_ptr:self.write_ptr + first] = block[:first]
+        if first < n:
+            self.buffer[:n - first] = block[first:]
+
+        # 3. Phase of tap 1 for every sample of the chunk, wrapped to 0-1
+        phase = self._phase[:n]
+        np.multiply(self._ramp[:n], self.phase_step, out=phase)
+        phase += self.phase
+        np.mod(phase, 1.0, out=phase)
+
+        # 4. Read both taps (180 deg apart) and sum them with their triangle windows
+        wet = self._wet[:n]
+        wet.fill(0.0)
+        tap = self._tap[:n]
+        gain = self._gain[:n, 0]
+        for _ in range(2):
+            # Read position = write index - delay, delay = MIN_DELAY + phase * window_len
+            pos = self._pos[:n]
+            np.multiply(phase, -self.window_len, out=pos)
+            pos += self._ramp[:n]
+            pos += self.write_ptr - self.MIN_DELAY
+
+            if self.interpolation == "none":
+                self._read_nearest(pos, tap)
+            elif self.interpolation == "linear":
+                self._read_linear(pos, tap)
+            else:
+                self._read_lagrange(pos, tap)
+
+            # Triangle window: 1.0 at center (phase 0.5), 0.0 at edges (phase 0.0/1.0)
+            np.subtract(phase, 0.5, out=gain)
+            np.abs(gain, out=gain)
+            gain *= -2.0
+            gain += 1.0
+            tap *= self._gain[:n]
+            wet += tap
+
+            # Second tap
+            phase += 0.5
+            np.mod(phase, 1.0, out=phase)
+
+        # 5. Mix dry and wet
+        if self._mix_ramp is None:
+            np.multiply(block, 1.0 - self.mix, out=out)
+            wet *= self.mix
+            out += wet
+        else:
+            # Per-sample mix while automated: out = dry + (wet - dry) * mix[i]
+            mix_start, mix_end = self._mix_ramp
+            mix = self._mix[:n]
+            slope = (mix_end - mix_start) / total
+            np.multiply(self._ramp[:n, np.newaxis], slope, out=mix)
+            mix += mix_start + slope * (offset + 1)
+            wet -= block
+            wet *= mix
+            np.add(block, wet, out=out)
+
+        # 6. Advance pointers (keep the phase wrapped 0-1)
+        self.write_ptr = (self.write_ptr + n) % size
+        self.phase = (self.phase + self.phase_step * n) % 1.0
+
+    def _read_nearest(self, pos, tap):
+        idx = self._idx[:pos.shape[0]]
+        np.floor(pos, out=pos)
+        idx[:] = pos
+        np.take(self.buffer, idx, axis=0, out=tap, mode='wrap')
+
+    def _split_position(self, pos):
+        n = pos.shape[0]
+        idx = self._idx[:n]
+        frac = self._frac[:n, 0]
+        np.floor(pos, out=frac)
+        idx[:] = frac
+        np.subtract(pos, frac, out=frac)
+        return idx, self._frac[:n]
+
+    def _read_linear(self, pos, tap):
+        n = pos.shape[0]
+        idx, frac = self._split_position(pos)
+        p0, p1 = self._taps[0, :n], self._taps[1, :n]
+        np.take(self.buffer, idx, axis=0, out=p0, mode='wrap')
+        idx += 1
+        np.take(self.buffer, idx, axis=0, out=p1, mode='wrap')
+
+        # tap = p0 + frac * (p1 - p0)
+        np.subtract(p1, p0, out=tap)
+        tap *= frac
+        tap += p0
+
+    def _read_lagrange(self, pos, tap):
+        n = pos.shape[0]
+        idx, frac = self._split_position(pos)
+        idx -= 1
+
+        # 3rd order Lagrange weights for the taps at -1, 0, 1, 2 (f = frac):
+        # h0 = -f(f-1)(f-2)/6, h1 = (f+1)(f-1)(f-2)/2, h2 = -(f+1)f(f-2)/2, h3 = (f+1)f(f-1)/6
+        fm1, fm2, fp1 = self._work[0, :n], self._work[1, :n], self._work[2, :n]
+        np.subtract(frac, 1.0, out=fm1)
+        np.subtract(frac, 2.0, out=fm2)
+        np.add(frac, 1.0, out=fp1)
+        h0, h1, h2, h3 = self._coef[0, :n], self._coef[1, :n], self._coef[2, :n], self._coef[3, :n]
+
+        np.multiply(frac, fm1, out=h3) # f(f-1)
+        np.multiply(h3, fm2, out=h0)
+        h0 *= -1.0 / 6.0
+        h3 *= fp1
+        h3 *= 1.0 / 6.0
+
+        np.multiply(fp1, fm2, out=h2) # (f+1)(f-2)
+        np.multiply(h2, fm1, out=h1)
+        h1 *= 0.5
+        h2 *= frac
+        h2 *= -0.5
+
+        tap.fill(0.0)
+        for k in range(4):
+            p = self._taps[k, :n]
+            np.take(self.buffer, idx, axis=0, out=p, mode='wrap')
+            p *= self._coef[k, :n]
+            tap += p
+            idx += 1
@@ -1,57 +1,170 @@
 import argparse
 import audio_config
 import fx_config
-from mod_aud_rec import AudioRecorder
-from plugin_manager import PluginManager
+from mod_aud_rec import AudioRecorder, StreamingAudioRecorder, CombinedRecorder
 from audio_engine import PedalboardEngine
+from chain_router import InputRouter
+from audio_render import render
+from mod_backing_track import BackingTrack
+from mod_config_watch import ConfigWatcher, load_presets
+from plugin_manager import PluginManager
+from preset_bank import PresetBank
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Guitar Pedalboard with Recording")
     parser.add_argument("-r", "--record", action="store_true", help="Record both clean and FX sounds")
-    parser.add_argument("-p", "--preset", type=str, choices=['a1', 'a2', 'a3', 'a4'], help="Load a specific preset (a1=Clean, a2=Lead, a3=Solo, a4=Crunch)")
+    parser.add_argument("-s", "--stream", action="store_true", help="With -r, stream recordings to disk while playing (constant memory)")
+    parser.add_argument("--format", type=str, choices=("wav", "flac", "ogg", "mp3"), default=None, help="With -r, recording format (default: mp3, or wav with -s); flac/ogg are encoded in the background")
+    parser.add_argument("--segment", type=float, metavar="SECONDS", default=None, help="With -r -s, split recordings into files of this length")
+    parser.add_argument("--combined", action="store_true", help="With -r -s, record clean and fx into one aligned 4-channel file")
+    parser.add_argument("--profile", action="store_true", help="Time every effect in the audio callback and print a report on exit")
+    parser.add_argument("-p", "--preset", type=str, choices=sorted(fx_config.PRESETS), help="Load a specific preset (a1=Clean, a2=Lead, a3=Solo, a4=Crunch, a5=Ambient Solo)")
+    parser.add_argument("--preload", action="store_true", help="Load every preset at startup so live switching never waits for a plugin load")
+    parser.add_argument("--routing", type=str, choices=sorted(fx_config.ROUTINGS), help="Multi-input mode: one chain per input channel, mixed to the outputs (see fx_config.ROUTINGS)")
+    parser.add_argument("--watch", type=str, nargs="?", const=fx_config.__file__, metavar="CONFIG", help="Reload presets when the config (fx_config.py, or a .json/.toml with the same keys) changes")
+    parser.add_argument("--optimize", action="store_true", help="Drop pass-through effects, fold Gains and fuse adjacent filters before running (fused effects cannot be changed live)")
+    parser.add_argument("--isolate", action="store_true", help="Run the effect chain in a separate worker process (a crashing plugin cannot stop the stream)")
+    parser.add_argument("--auto-tune", action="store_true", help="Measure the chain at startup and pick the smallest safe block size and latency")
+    parser.add_argument("--adaptive", action="store_true", help="Restart the stream with a larger block size when xruns pile up")
+    parser.add_argument("--debug-rt", action="store_true", help="Assert on allocations and dtype conversions in every effect stage (debugging)")
+    parser.add_argument("--idle-bypass", action="store_true", help="Skip the effect chain while the input is silent and effect tails have decayed")
+    parser.add_argument("--backing", type=str, metavar="FILE", help="Play a backing track (any format libsndfile reads), mixed into the output after the effects")
+    parser.add_argument("--backing-loop", action="store_true", help="With --backing, start the track over when it ends")
+    parser.add_argument("--measure-latency", action="store_true", help="Measure the round-trip latency (needs output 1 looped to input 1) and the chain's added latency, then exit")
+    parser.add_argument("--loopback", action="store_true", help="With --measure-latency, use a software loopback instead of the audio device (CI)")
+    parser.add_argument("--render", type=str, metavar="IN", help="Render an audio file (or a directory of files) offline instead of running live")
+    parser.add_argument("--out", type=str, metavar="OUT", help="Output file (or directory) for --render")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for rendering a directory (default: all cores)")
+    parser.add_argument("--list-effects", action="store_true", help="List the available internal and custom effects with their parameters")
     return parser.parse_args()
 
+def list_effects():
+    effects = PluginManager.list_effects()
+    print("🎛️ Internal effects (pedalboard):")
+    for name, signature in effects["internal"].items():
+        print(f"   {name}({signature})")
+    print("🧩 Custom effects (fx_custom):")
+    for name, info in sorted(effects["custom"].items()):
+        print(f"   {name}({info['signature']})  [{info['module']}.py]")
+    if effects["vst3"]:
+        print("🔌 VST3 plugins (cached in .plugin_cache/):")
+        for path, entry in sorted(effects["vst3"].items()):
+            print(f"   {entry['name']}({', '.join(entry['parameters'])})  [{path}]")
+
 def main():
     args = parse_arguments()
 
+    if args.list_effects:
+        list_effects()
+        return
+
     # 1. Load Configuration
     plugin_config = fx_config.PLUGIN_CHAIN_CONFIG
-    
-    if args.preset == 'a1':
-        print("Loading Preset: Clean Tone")
-        plugin_config = fx_config.PLUGIN_CHAIN_CONFIG_DEMO_CleanTone
-    elif args.preset == 'a2':
-        print("Loading Preset: Lead Guitar")
-        plugin_config = fx_config.PLUGIN_CHAIN_CONFIG_DEMO_LeadGuitar
-    elif args.preset == 'a3':
-        print("Loading Preset: Solo Guitar")
-        plugin_config = fx_config.PLUGIN_CHAIN_CONFIG_DEMO_SoloGuitar
-    elif args.preset == 'a4':
-        print("Loading Preset: Crunch")
-        plugin_config = fx_config.PLUGIN_CHAIN_CONFIG_DEMO_Crunch
+
+    if args.preset:
+        _label, plugin_config = fx_config.PRESETS[args.preset]
+
+    # Offline rendering: stream files through the chain, no audio device needed
+    if args.render:
+        if not args.out:
+            print("❌ --render needs --out")
+            return
+        render(args.render, args.out, plugin_config, workers=args.workers)
+        return
 
     # 2. Build Effect Chain
-    # The PluginManager handles the complexity of creating different types of effects
-    plugin_chain = PluginManager.load_effect_chain(plugin_config)
+    # The PresetBank builds chains through the PluginManager and keeps them cached,
+    # so presets can be switched live while the engine runs
+    # A watched config (e.g. a JSON/TOML file) replaces the presets from fx_config.py
+    presets = load_presets(args.watch) if args.watch else None
+    # --optimize: pass-through stages are dropped, Gains folded and adjacent filters fused
+    preset_bank = PresetBank(presets, group_native=not args.profile, optimize=args.optimize)
+    if args.optimize and args.isolate:
+        print("⚠️ --optimize is not available with --isolate (the worker builds its own chain)")
+    if args.preload and not args.isolate and not args.routing:
+        preset_bank.preload()
+
+    # Multi-input: every route builds its own chain; presets are only used as chain configs
+    router = None
+    input_channels = output_channels = 2
+    if args.routing:
+        if args.isolate:
+            print("⚠️ --isolate is not available with --routing, running in-process")
+            args.isolate = False
+        label, routing = fx_config.ROUTINGS[args.routing]
+        print(f"🔀 Routing: {label}")
+        router = InputRouter.from_config(routing, preset_bank.presets, group_native=not args.profile,
+                                         optimize=args.optimize)
+        input_channels, output_channels = router.input_channels, router.output_channels
 
     # 3. Setup Recorders (if requested)
     clean_recorder = None
     fx_recorder = None
+    recorder = None
 
-    if args.record:
+    if args.record and (args.stream or args.segment or args.combined):
+        # Streaming recorders write (and encode) on a background thread as they go
+        fmt = args.format or "wav"
+        if args.combined:
+            recorder = CombinedRecorder(audio_config.SAMPLE_RATE, fmt=fmt, segment_seconds=args.segment,
+                                        input_channels=input_channels, output_channels=output_channels)
+        else:
+            clean_recorder = StreamingAudioRecorder(audio_config.SAMPLE_RATE, suffix="-clean", fmt=fmt,
+                                                    segment_seconds=args.segment, channels=input_channels)
+            fx_recorder = StreamingAudioRecorder(audio_config.SAMPLE_RATE, suffix="-fx", fmt=fmt,
+                                                 segment_seconds=args.segment, channels=output_channels)
+    elif args.record:
         # We pass the sample rate so recorders know how to save files correctly
-        clean_recorder = AudioRecorder(audio_config.SAMPLE_RATE)
-        fx_recorder = AudioRecorder(audio_config.SAMPLE_RATE)
+        clean_recorder = AudioRecorder(audio_config.SAMPLE_RATE, fmt=args.format or "mp3")
+        fx_recorder = AudioRecorder(audio_config.SAMPLE_RATE, fmt=args.format or "mp3")
+
+    # Backing track: converted to the engine rate once (cached), then streamed from disk
+    backing = None
+    if args.backing and not (args.measure_latency or args.loopback):
+        try:
+            backing = BackingTrack(args.backing, audio_config.SAMPLE_RATE, gain_db=audio_config.BACKING_GAIN_DB,
+                                   loop=args.backing_loop, ring_seconds=audio_config.BACKING_RING_S)
+        except (ValueError, RuntimeError) as e:
+            print(f"❌ Could not open backing track: {e}")
+            return
 
     # 4. Initialize and Run Engine
     # The PedalboardEngine handles the realtime audio loop
     engine = PedalboardEngine(
         clean_recorder=clean_recorder,
         fx_recorder=fx_recorder,
-        plugin_chain=plugin_chain
+        profile=args.profile,
+        preset_bank=preset_bank,
+        preset=args.preset or "default",
+        isolate=args.isolate,
+        auto_tune=args.auto_tune,
+        adaptive=args.adaptive,
+        idle_bypass=args.idle_bypass,
+        recorder=recorder,
+        debug_realtime=args.debug_rt,
+        router=router,
+        loopback=args.loopback,
+        backing=backing
     )
 
+    if args.measure_latency:
+        engine.measure_latency()
+        return
+    if args.loopback:
+        print("❌ --loopback only works with --measure-latency (a live loop would feed back)")
+        return
+
+    # Config hot-reload: only changed effects are rebuilt, on the watcher thread
+    watcher = None
+    if args.watch and engine.preset_bank:
+        watcher = ConfigWatcher(args.watch, engine.reload_presets)
+        watcher.start()
+    elif args.watch:
+        print("⚠️ --watch is not available with --isolate or --routing")
+
     engine.run()
+    if watcher:
+        watcher.stop()
 
 if __name__ == "__main__":
     main()
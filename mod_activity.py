@@ -0,0 +1,118 @@
+import math
+import numpy as np
+import pedalboard
+
+DEFAULT_TAIL_S = 2.0 # Effects that declare nothing and cannot be inferred (e.g. VST3 plugins)
+
+def effect_tail_seconds(effect) -> float:
+    """
+    How long an effect keeps ringing after its input goes silent (to about -60 dB).
+    Custom effects declare it as a `tail_seconds` attribute; native ones are inferred from their parameters.
+    """
+    tail = getattr(effect, "tail_seconds", None)
+    if tail is not None:
+        return float(tail)
+    effect = getattr(effect, "effect", effect) # Wrapped effects (e.g. oversampled stages) ring like the wrapped one
+    if hasattr(effect, "branches"):
+        # Parallel block: the longest branch
+        return max((chain_tail_seconds(branch.chain.effects) for branch in effect.branches), default=0.0)
+
+    if isinstance(effect, pedalboard.Reverb):
+        if effect.freeze_mode >= 0.5:
+            return math.inf
+        # Freeverb combs: ~36 ms loops with feedback room_size * 0.28 + 0.7
+        feedback = effect.room_size * 0.28 + 0.7
+        return 0.036 * math.log(1e-3) / math.log(feedback)
+    if isinstance(effect, pedalboard.Delay):
+        if effect.feedback <= 0.0:
+            return effect.delay_seconds
+        if effect.feedback >= 1.0:
+            return math.inf
+        return effect.delay_seconds * (1.0 + math.log(1e-3) / math.log(effect.feedback))
+    if isinstance(effect, (pedalboard.Chorus, pedalboard.Phaser)):
+        return 0.05
+    if isinstance(effect, (pedalboard.Compressor, pedalboard.Limiter, pedalboard.NoiseGate)):
+        return getattr(effect, "release_ms", 0.0) / 1000.0
+    if isinstance(effect, pedalboard.Convolution):
+        return DEFAULT_TAIL_S
+    if isinstance(effect, pedalboard.ExternalPlugin):
+        return DEFAULT_TAIL_S
+    # Filters, gains, distortion and other memoryless or short-memory effects
+    return 0.0
+
+def chain_tail_seconds(effects) -> float:
+    # Tails of a serial chain add up: a delay feeding a reverb rings for both
+    return sum(effect_tail_seconds(effect) for effect in effects)
+
+class ActivityDetector:
+    """
+    Decides per block whether the chain needs to run at all.
+
+    The input level is a cheap block RMS with hysteresis: the detector goes quiet below
+    `threshold_db - hysteresis_db` and wakes up again above `threshold_db`. Once the input has been
+    quiet for `hold_seconds` plus the chain's tail (so reverb and delay trails have decayed), blocks
+    are skipped and the output is silence. The first loud block is processed in full.
+    The engine fades its output out on the first skipped block and back in on the first loud one.
+
+    The tail is set with set_tail() from outside the audio thread (when the chain is switched,
+    and refreshed by the engine's command loop as parameters change), so update() never walks the chain.
+    """
+    def __init__(self, sample_rate: int, threshold_db: float = -60.0, hysteresis_db: float = 6.0,
+                 hold_seconds: float = 0.5):
+        self.sample_rate = sample_rate
+        self.hold_seconds = hold_seconds
+        # Compared against mean square, so no sqrt/log on the audio thread
+        self._open_power = 10.0 ** (threshold_db / 10.0)
+        self._close_power = 10.0 ** ((threshold_db - hysteresis_db) / 10.0)
+
+        self.quiet = False
+        self._quiet_samples = 0
+        self._idle_after = math.inf # Quiet samples after which blocks are skipped
+        self.tail_seconds = 0.0 # Of the running chain, see set_tail()
+
+        # Counters (read from other threads, written only by the audio thread)
+        self.blocks = 0
+        self.skipped_blocks = 0
+        self.idle_periods = 0
+
+    def reset(self):
+        self.quiet = False
+        self._quiet_samples = 0
+
+    def set_tail(self, effects):
+        """
+        Sizes the decay wait for the running chain's effects (current parameters).
+        """
+        self.tail_seconds = chain_tail_seconds(effects)
+
+    def update(self, block) -> bool:
+        """
+        Feeds one input block. Returns True when the chain can be skipped for this block.
+        """
+        frames = block.shape[0]
+        self.blocks += 1
+        power = np.vdot(block, block) / block.size
+
+        if power >= self._open_power or (not self.quiet and power >= self._close_power):
+            self.quiet = False
+            self._quiet_samples = 0
+            return False
+
+        if not self.quiet:
+            self.quiet = True
+            self._quiet_samples = 0
+            tail = self.tail_seconds
+            self._idle_after = (self.hold_seconds + tail) * self.sample_rate if math.isfinite(tail) else math.inf
+
+        self._quiet_samples += frames
+        if self._quiet_samples < self._idle_after:
+            return False
+        if self._quiet_samples - frames < self._idle_after:
+            self.idle_periods += 1
+        self.skipped_blocks += 1
+        return True
+
+    def report(self) -> str:
+        share = self.skipped_blocks / self.blocks * 100 if self.blocks else 0.0
+        return (f"💤 Idle bypass: {self.skipped_blocks}/{self.blocks} blocks skipped ({share:.1f}%), "
+                f"{self.idle_periods} idle periods")
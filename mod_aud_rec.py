@@ -1,17 +1,51 @@
 import os
+import threading
+import time
 from datetime import datetime
 import numpy as np
 import soundfile as sf
+from mod_ring_buffer import RingBuffer
+
+# Recording formats: extension -> (libsndfile format, subtype)
+FORMATS = {
+    "wav": ("WAV", "FLOAT"),
+    "flac": ("FLAC", "PCM_24"),
+    "ogg": ("OGG", "VORBIS"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
+def format_available(fmt: str) -> bool:
+    """
+    True if the installed libsndfile can encode `fmt` (MP3 needs libsndfile >= 1.1 built with LAME).
+    """
+    major, subtype = FORMATS[fmt]
+    return major in sf.available_formats() and subtype in sf.available_subtypes(major)
+
+def _resolve_format(fmt: str) -> str:
+    if format_available(fmt):
+        return fmt
+    print(f"⚠️ {fmt.upper()} encoding is not available in this libsndfile, recording as WAV instead.")
+    return "wav"
+
+def take_timestamp() -> str:
+    """
+    The rec-<timestamp> part of a recording's file name: YYYYMMDDhhmmss.xxx (milliseconds).
+    The engine takes one per take and hands it to every recorder, so -clean and -fx files match.
+    """
+    return datetime.now().strftime("%Y%m%d%H%M%S.%f")[:18]
 
 class AudioRecorder:
-    def __init__(self, sample_rate):
+    def __init__(self, sample_rate, fmt="mp3"):
         self.sample_rate = sample_rate
+        self.fmt = fmt
         self.frames = []
         self.is_recording = False
+        self.timestamp = None
 
-    def start(self):
+    def start(self, timestamp=None):
         self.is_recording = True
         self.frames = []
+        self.timestamp = timestamp
         print("🔴 Recording started...")
 
     def add_frame(self, data):
@@ -29,29 +63,170 @@ class AudioRecorder:
 
         # Create filename: DateYYYYMMDDhhmmss.xxx-suffix.mp3
         if timestamp is None:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S.%f")[:18] #.xxx for millis
+            timestamp = self.timestamp or take_timestamp()
 
-        filename = f"rec-{timestamp}{suffix}.mp3"
+        # Pick the format before encoding anything, so a missing MP3 encoder does not cost a failed attempt
+        fmt = _resolve_format(self.fmt)
+        major, subtype = FORMATS[fmt]
+        filename = f"rec-{timestamp}{suffix}.{fmt}"
         filepath = os.path.join(output_dir, filename)
 
         print(f"💾 Saving recording to {filepath}...")
 
+        # Concatenate all frames
+        audio_data = np.concatenate(self.frames, axis=0)
         try:
-            # Concatenate all frames
-            audio_data = np.concatenate(self.frames, axis=0)
-
-            # Save using soundfile
-            # Note: writing to MP3 requires libmp3lame.
-            # If it fails, soundfile usually raises an error.
-            sf.write(filepath, audio_data, self.sample_rate)
+            sf.write(filepath, audio_data, self.sample_rate, format=major, subtype=subtype)
             print("✅ Save complete.")
         except (OSError, RuntimeError) as e:
             print(f"❌ Error saving file: {e}")
-            # Fallback to WAV if MP3 fails
+            if fmt == "wav":
+                return
+            # Fallback to WAV if the encoder fails anyway
             try:
-                wav_path = filepath.replace(".mp3", ".wav")
+                wav_path = os.path.splitext(filepath)[0] + ".wav"
                 print(f"🔄 Retrying as WAV: {wav_path}")
                 sf.write(wav_path, audio_data, self.sample_rate)
                 print("✅ Saved as WAV.")
             except (OSError, RuntimeError) as e2:
                 print(f"❌ WAV fallback failed: {e2}")
+
+class StreamingAudioRecorder:
+    """
+    Records straight to disk while the stream is running.
+    The audio callback only copies each block into a preallocated ring buffer; a background
+    thread drains the ring into an open soundfile.SoundFile in large chunks, so encoding
+    (FLAC, Ogg Vorbis) also happens off the audio thread.
+    Memory use is constant no matter how long the session is.
+
+    With `segment_seconds`, the recording is split into numbered files of that length
+    (rec-<timestamp><suffix>-001.flac, ...). Finished segments are closed, so a crash loses
+    at most the segment being written.
+    """
+    def __init__(self, sample_rate, suffix="", output_dir="output", channels=2,
+                 ring_seconds=4.0, chunk_seconds=0.25, fmt="wav", segment_seconds=None):
+        self.sample_rate = sample_rate
+        self.suffix = suffix
+        self.output_dir = output_dir
+        self.fmt = _resolve_format(fmt)
+        self.segment_frames = int(sample_rate * segment_seconds) if segment_seconds else None
+        self.ring = RingBuffer(int(sample_rate * ring_seconds), channels)
+        self.chunk = np.zeros((int(sample_rate * chunk_seconds), channels), dtype=np.float32)
+        self.is_recording = False
+        self.filepath = None
+        self.files = [] # Every file written so far (one per segment)
+        self._basename = None
+        self._file = None
+        self._segment_written = 0
+        self._writer = None
+
+    def start(self, timestamp=None):
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = timestamp or take_timestamp()
+        self._basename = os.path.join(self.output_dir, f"rec-{timestamp}{self.suffix}")
+        self.files = []
+        self._open_segment()
+
+        self.is_recording = True
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+        segments = f", {self.segment_frames / self.sample_rate:.0f} s segments" if self.segment_frames else ""
+        print(f"🔴 Recording started (streaming to {self.filepath}{segments})...")
+
+    def _open_segment(self):
+        major, subtype = FORMATS[self.fmt]
+        number = f"-{len(self.files) + 1:03d}" if self.segment_frames else ""
+        self.filepath = f"{self._basename}{number}.{self.fmt}"
+        self._file = sf.SoundFile(self.filepath, mode="w", samplerate=self.sample_rate,
+                                  channels=self.ring.channels, format=major, subtype=subtype)
+        self.files.append(self.filepath)
+        self._segment_written = 0
+
+    def add_frame(self, data):
+        if self.is_recording:
+            # One memcpy into the ring; overflows are counted by the ring itself
+            self.ring.write(data)
+
+    def _write(self, data):
+        # Splits the data at segment boundaries (writer thread only)
+        while data.shape[0]:
+            count = data.shape[0]
+            if self.segment_frames:
+                count = min(count, self.segment_frames - self._segment_written)
+            self._file.write(data[:count])
+            self._segment_written += count
+            data = data[count:]
+            if self.segment_frames and self._segment_written == self.segment_frames:
+                self._file.close()
+                self._open_segment()
+
+    def _drain(self):
+        frames = self.ring.read(self.chunk)
+        if frames:
+            self._write(self.chunk[:frames])
+        return frames
+
+    def _writer_loop(self):
+        # Poll a few times per chunk so the ring never gets close to full
+        poll_interval = self.chunk.shape[0] / self.sample_rate / 4
+        while self.is_recording:
+            if self.ring.available() >= self.chunk.shape[0]:
+                self._drain()
+            else:
+                time.sleep(poll_interval)
+
+        # Flush whatever is left after the stream stopped
+        while self._drain():
+            pass
+
+    def save(self, output_dir=None, timestamp=None, suffix=""):
+        # The file was named and opened in start() (with the take's timestamp from the engine),
+        # so the arguments are only accepted for compatibility with AudioRecorder.save().
+        if self._file is None:
+            print(f"⚠️ No audio recorded for {self.suffix}.")
+            return
+
+        self.is_recording = False
+        self._writer.join()
+        self._file.close()
+        self._file = None
+        if self.segment_frames and self._segment_written == 0:
+            # The recording ended exactly on a segment boundary: drop the empty segment
+            os.remove(self.files.pop())
+            self.filepath = self.files[-1] if self.files else None
+
+        if self.ring.overflow_count:
+            print(f"⚠️ Recorder ring overflowed {self.ring.overflow_count} times "
+                  f"({self.ring.dropped_frames} frames dropped) for {self.suffix}.")
+        if not self.files:
+            print(f"⚠️ No audio recorded for {self.suffix}.")
+        elif len(self.files) > 1:
+            print(f"✅ Saved {len(self.files)} segments: {self.files[0]} ... {self.files[-1]}")
+        else:
+            print(f"✅ Saved {self.files[-1]}")
+
+class CombinedRecorder(StreamingAudioRecorder):
+    """
+    Streams clean and fx into one multichannel file: the input channels first, then the output
+    channels (1-2: clean, 3-4: fx on a stereo setup).
+    Both halves of a frame come from the same callback block, so they stay sample-aligned
+    for reamping or comparison, with no second file to line up afterwards.
+    """
+    def __init__(self, sample_rate, suffix="-clean+fx", output_dir="output", fmt="wav", segment_seconds=None,
+                 max_block=4096, input_channels=2, output_channels=2):
+        channels = input_channels + output_channels
+        super().__init__(sample_rate, suffix=suffix, output_dir=output_dir, channels=channels, fmt=fmt,
+                         segment_seconds=segment_seconds)
+        self.input_channels = input_channels
+        self._block = np.zeros((max_block, channels), dtype=np.float32)
+
+    def add_frames(self, clean, fx):
+        if not self.is_recording:
+            return
+        frames = clean.shape[0]
+        if frames > self._block.shape[0]:
+            self._block = np.zeros((frames, self._block.shape[1]), dtype=np.float32) # Not expected: blocks are bounded
+        block = self._block[:frames]
+        block[:, :self.input_channels] = clean
+        block[:, self.input_channels:] = fx
+        self.ring.write(block)
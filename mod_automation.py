@@ -0,0 +1,94 @@
+from collections import deque
+
+class _Ramp:
+    __slots__ = ("effect", "name", "value", "target", "step", "remaining")
+
+    def __init__(self):
+        self.effect = None
+        self.name = None
+        self.value = 0.0
+        self.target = 0.0
+        self.step = 0.0
+        self.remaining = 0
+
+class ParameterAutomation:
+    """
+    Parameter changes for a running chain, safe to push from any thread (MIDI, OSC, GUI...).
+
+    Changes go into a deque (append/popleft are atomic, so no lock is needed) and are drained by
+    the audio callback at the start of each block. Continuous (numeric) parameters glide to their
+    target over `smoothing_ms`:
+      - effects with a `set_ramp(name, start, end)` method (fx_custom) get a per-sample ramp
+        for every block of the glide,
+      - pedalboard plugins only take scalar parameters, so they are updated once per block.
+    Ramps come from a fixed pool, so draining does not allocate.
+    """
+    MAX_RAMPS = 32
+
+    def __init__(self, sample_rate: int, smoothing_ms: float = 20.0):
+        self.smoothing_samples = max(1, int(sample_rate * smoothing_ms / 1000))
+        self._queue = deque()
+        self._pool = [_Ramp() for _ in range(self.MAX_RAMPS)]
+        self._active = []
+
+    def push(self, effect, name: str, value, smooth: bool = True):
+        """
+        Queues `effect.name = value` for the next block boundary. Call from any thread.
+        """
+        self._queue.append((effect, name, value, smooth))
+
+    def _start_ramp(self, effect, name, target):
+        # Retarget an existing ramp for the same parameter instead of stacking two
+        ramp = None
+        for active in self._active:
+            if active.effect is effect and active.name == name:
+                ramp = active
+                break
+        if ramp is None:
+            if not self._pool:
+                setattr(effect, name, target) # Pool exhausted: jump instead of gliding
+                return
+            ramp = self._pool.pop()
+            ramp.effect = effect
+            ramp.name = name
+            ramp.value = float(getattr(effect, name))
+            self._active.append(ramp)
+
+        ramp.target = target
+        ramp.step = (target - ramp.value) / self.smoothing_samples
+        ramp.remaining = self.smoothing_samples
+
+    def process_block(self, frames: int):
+        """
+        Called by the audio callback before the chain runs: applies queued changes and
+        advances every active ramp by one block.
+        """
+        while self._queue:
+            effect, name, value, smooth = self._queue.popleft()
+            current = getattr(effect, name, None)
+            is_numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if smooth and is_numeric and isinstance(current, (int, float)) and not isinstance(current, bool):
+                self._start_ramp(effect, name, float(value))
+            else:
+                setattr(effect, name, value)
+
+        if not self._active:
+            return
+
+        for ramp in self._active:
+            start = ramp.value
+            steps = min(frames, ramp.remaining)
+            ramp.remaining -= steps
+            ramp.value = ramp.target if ramp.remaining <= 0 else start + ramp.step * steps
+            if hasattr(ramp.effect, "set_ramp"):
+                ramp.effect.set_ramp(ramp.name, start, ramp.value)
+            else:
+                setattr(ramp.effect, ramp.name, ramp.value)
+
+        # Return finished ramps to the pool (iterate backwards so removal is safe)
+        for index in range(len(self._active) - 1, -1, -1):
+            ramp = self._active[index]
+            if ramp.remaining <= 0:
+                del self._active[index]
+                ramp.effect = None
+                self._pool.append(ramp)
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import soundfile as sf
+from mod_oversample import PolyphaseResampler
+from mod_ring_buffer import RingBuffer
+
+class BackingTrack:
+    """
+    A backing track mixed into the engine output after the effect chain (--backing).
+
+    The file is converted once, up front, into a raw float32 stereo file at the engine rate
+    (.backing_cache/, keyed by path, mtime and rate). Decoding and resampling stream through the file
+    in chunks, so even a long track never has to fit in RAM, and the next start skips the conversion.
+    Playback memory-maps the cache: a reader thread copies the next frames into a RingBuffer,
+    and the audio callback only copies preconverted float32 blocks out of the ring and adds them
+    to outdata. Seeking moves the reader and flushes the ring at the next block; nothing is decoded.
+    """
+    CACHE_DIR = ".backing_cache"
+    CHANNELS = 2
+
+    def __init__(self, path: str, sample_rate: int, gain_db: float = 0.0, loop: bool = False,
+                 ring_seconds: float = 2.0, chunk_seconds: float = 0.1, max_block: int = 4096):
+        if not os.path.exists(path):
+            raise ValueError(f"Backing track not found: {path}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.gain = 10.0 ** (gain_db / 20.0)
+        self.loop = loop
+        self.cache_path = self._convert()
+        self.data = np.memmap(self.cache_path, dtype=np.float32, mode="r").reshape(-1, self.CHANNELS)
+        self.frames = self.data.shape[0]
+
+        self.ring = RingBuffer(int(sample_rate * ring_seconds), self.CHANNELS)
+        self.chunk = int(sample_rate * chunk_seconds)
+        self._block = np.zeros((max_block, self.CHANNELS), dtype=np.float32)
+        self.position = 0 # Next frame the reader copies into the ring
+        self.underruns = 0
+        self._refilling = False # Set by the callback after a seek flush, until the ring has data again
+        self._seek_to = None # Frame requested by seek(), picked up by the reader
+        self._flush_at = 0 # Ring write index where the data after the last seek starts (only grows)
+        self._running = False
+        self._reader = None
+
+    def _cache_file(self) -> str:
+        key = f"{os.path.abspath(self.path)}|{os.path.getmtime(self.path)}|{self.sample_rate}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(self.path))[0]
+        return os.path.join(self.CACHE_DIR, f"{name}-{digest}.f32")
+
+    def _convert(self) -> str:
+        """
+        Decodes and resamples the track chunk by chunk into the float32 cache (skipped if cached).
+        """
+        cache_path = self._cache_file()
+        if os.path.exists(cache_path):
+            return cache_path
+
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        info = sf.info(self.path)
+        print(f"🎼 Converting backing track {os.path.basename(self.path)} "
+              f"({info.duration:.0f} s, {info.samplerate} -> {self.sample_rate} Hz)...")
+        resampler = None
+        if info.samplerate != self.sample_rate:
+            resampler = PolyphaseResampler(self.sample_rate, info.samplerate)
+        block_frames = resampler.max_block if resampler else 65536
+        # Written under a temporary name, so an interrupted conversion is never mistaken for a cache hit
+        partial_path = cache_path + ".part"
+        with open(partial_path, "wb") as out:
+            skip = int(round(resampler.delay_output)) if resampler else 0 # Filter delay, trimmed off the start
+            expected = int(round(info.frames * self.sample_rate / info.samplerate))
+            written = 0
+            tail = [np.zeros((resampler.taps, info.channels), dtype=np.float32)] if resampler else []
+            blocks = sf.blocks(self.path, blocksize=block_frames, dtype="float32", always_2d=True)
+            for block in self._blocks(blocks, tail):
+                block = block[:, :self.CHANNELS] if block.shape[1] >= self.CHANNELS else np.repeat(block, self.CHANNELS, axis=1)
+                if resampler:
+                    block = resampler.process(np.ascontiguousarray(block))
+                    dropped = min(skip, block.shape[0])
+                    block = block[dropped:]
+                    skip -= dropped
+                block = block[:expected - written]
+                np.ascontiguousarray(block, dtype=np.float32).tofile(out)
+                written += block.shape[0]
+        os.replace(partial_path, cache_path)
+        return cache_path
+
+    @staticmethod
+    def _blocks(blocks, tail):
+        yield from blocks
+        yield from tail # Zeros that flush the resampler's filter
+
+    def seek(self, seconds: float):
+        """
+        Jumps to `seconds` into the track. Call from any thread: the reader refills the ring from the
+        new position and the callback drops what was queued before, at its next block.
+        """
+        self._seek_to = min(max(0, int(seconds * self.sample_rate)), self.frames)
+
+    def start(self):
+        self._running = True
+        self._reader = threading.Thread(target=self._reader_loop, daemon=True, name="backing-reader")
+        self._reader.start()
+        print(f"🎼 Backing track: {os.path.basename(self.path)} ({self.frames / self.sample_rate:.0f} s)")
+
+    def stop(self):
+        self._running = False
+        if self._reader:
+            self._reader.join()
+
+    def _reader_loop(self):
+        # Poll a few times per chunk so the ring stays close to full
+        poll_interval = self.chunk / self.sample_rate / 4
+        while self._running:
+            seek_to = self._seek_to
+            if seek_to is not None:
+                self._seek_to = None
+                self.position = seek_to
+                self._flush_at = self.ring.write_index
+
+            if self.position >= self.frames and self.loop:
+                self.position = 0
+            if self.position >= self.frames or self.ring.free() < self.chunk:
+                time.sleep(poll_interval)
+                continue
+            # Page faults on the memory map happen here, not on the audio thread
+            count = min(self.chunk, self.frames - self.position)
+            self.ring.write(self.data[self.position:self.position + count])
+            self.position += count
+
+    def mix_into(self, outdata):
+        """
+        Called by the audio callback after the chain: adds the next frames to outdata's first two channels.
+        """
+        flush_at = self._flush_at
+        if flush_at > self.ring.read_index:
+            self.ring.read_index = flush_at # Drop what was queued before the seek
+            self._refilling = True
+
+        frames = outdata.shape[0]
+        block = self._block[:frames]
+        count = self.ring.read(block)
+        if count < frames and self.position < self.frames and self._running and not self._refilling:
+            self.underruns += 1 # The reader fell behind
+        if count:
+            self._refilling = False
+        block = block[:count]
+        block *= self.gain
+        outdata[:count, :self.CHANNELS] += block
+
+    def report(self) -> str:
+        return f"🎼 Backing track: {self.underruns} underruns"
@@ -0,0 +1,82 @@
+import tracemalloc
+import numpy as np
+
+class BufferArena:
+    """
+    Engine-owned pool of preallocated float32 blocks.
+
+    Stages and engine buffers ask for their blocks once (at load / block size change, never on the
+    audio thread) under a key, and keep writing into the same memory afterwards. The whole signal
+    path then stays float32 and (samples, channels), so no block is converted or reallocated.
+    The engine's sample rate travels with it, so stages can prepare their effects when bound.
+    """
+    def __init__(self, block_size: int, channels: int = 2, dtype=np.float32, sample_rate: int = None):
+        self.block_size = block_size
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.dtype = dtype
+        self._blocks = {}
+
+    def block(self, key, planar: bool = False, channels: int = None) -> np.ndarray:
+        """
+        The block registered under `key`, allocated on first request.
+        (samples, channels) by default, (channels, samples) with planar=True (pedalboard's layout).
+        `channels` overrides the arena default (e.g. effect chains stay stereo on a 4-channel interface).
+        """
+        channels = channels or self.channels
+        shape = (channels, self.block_size) if planar else (self.block_size, channels)
+        block = self._blocks.get(key)
+        if block is None or block.shape != shape:
+            block = np.zeros(shape, dtype=self.dtype)
+            self._blocks[key] = block
+        return block
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.nbytes for block in self._blocks.values())
+
+class RealtimeGuard:
+    """
+    Debug assertion mode for the realtime path (--debug-rt).
+
+    Every stage is run under tracemalloc: a stage that allocates more than `limit_bytes` during a
+    block (beyond the small Python objects NumPy views and scalars cost), or that returns anything
+    but a float32 (samples, channels) block, raises an AssertionError naming the stage.
+    Stages with a known, unavoidable allocation (e.g. pedalboard returns a new array from every
+    call) set `allocates = True` and are only checked for dtype and layout.
+    The first `warmup_blocks` after start or a chain switch are not checked (lazy first-call setup).
+    """
+    def __init__(self, limit_bytes: int = 4096, warmup_blocks: int = 8):
+        self.limit_bytes = limit_bytes
+        self.warmup_blocks = warmup_blocks
+        self.blocks_checked = 0
+        self._warmup = warmup_blocks
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def warmup(self):
+        self._warmup = self.warmup_blocks
+
+    def check_input(self, signal):
+        assert signal.dtype == np.float32, f"Input block is {signal.dtype}, expected float32"
+
+    def run(self, stage, signal, sample_rate):
+        if self._warmup:
+            return stage(signal, sample_rate)
+
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        out = stage(signal, sample_rate)
+        allocated = tracemalloc.get_traced_memory()[1] - before
+
+        assert out.dtype == np.float32, f"{stage.name} returned {out.dtype}, expected float32"
+        assert out.shape == signal.shape, f"{stage.name} returned shape {out.shape}, expected {signal.shape}"
+        assert allocated <= self.limit_bytes or getattr(stage, "allocates", False), \
+            f"{stage.name} allocated {allocated} bytes in one block (limit {self.limit_bytes})"
+        return out
+
+    def end_block(self):
+        if self._warmup:
+            self._warmup -= 1
+        else:
+            self.blocks_checked += 1
@@ -0,0 +1,128 @@
+import importlib.util
+import json
+import os
+import threading
+import time
+
+try:
+    import tomllib # Python 3.11+
+except ImportError:
+    tomllib = None
+
+def load_presets(path: str) -> dict:
+    """
+    Reads the presets from a config source: key -> (label, chain config), plus "default".
+
+    - .py: a module like fx_config.py (PLUGIN_CHAIN_CONFIG and PRESETS), executed fresh on every call,
+    - .json / .toml: the same two names as top-level keys. A preset is either ["Label", [chain...]]
+      or {"label": "Label", "chain": [chain...]}.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".py":
+        spec = importlib.util.spec_from_file_location(f"_watched_{os.path.basename(path)[:-3]}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        data = {"PLUGIN_CHAIN_CONFIG": getattr(module, "PLUGIN_CHAIN_CONFIG", None),
+                "PRESETS": getattr(module, "PRESETS", {})}
+    elif extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    elif extension == ".toml":
+        if tomllib is None:
+            raise ValueError("TOML configs need Python 3.11+ (tomllib)")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        raise ValueError(f"Unsupported config format: {path} (use .py, .json or .toml)")
+
+    presets = {}
+    if data.get("PLUGIN_CHAIN_CONFIG") is not None:
+        presets["default"] = ("Default", list(data["PLUGIN_CHAIN_CONFIG"]))
+    for key, preset in data.get("PRESETS", {}).items():
+        if isinstance(preset, dict):
+            presets[key] = (preset.get("label", key), list(preset["chain"]))
+        else:
+            label, chain = preset
+            presets[key] = (label, list(chain))
+    return presets
+
+def _identity(item: dict) -> tuple:
+    # Parallel blocks are compared as a whole: any change inside a branch reloads the block
+    return (item.get("type"), item.get("name"), item.get("path"), item.get("oversample"),
+            json.dumps(item.get("branches"), sort_keys=True, default=str))
+
+def diff_chain(old: list, new: list) -> list:
+    """
+    Compares two chain configs position by position. One entry per new config item:
+      - {param: value} of the params that changed (empty if none) when the item at the same position
+        has the same type, name, path and oversampling, so the running effect can be kept,
+      - None when the item is new, replaced, or drops a param (its default cannot be restored in place).
+    """
+    result = []
+    for index, item in enumerate(new):
+        previous = old[index] if index < len(old) else None
+        if previous is None or _identity(previous) != _identity(item):
+            result.append(None)
+            continue
+        old_params = previous.get("params", {})
+        new_params = item.get("params", {})
+        if set(old_params) - set(new_params):
+            result.append(None)
+            continue
+        result.append({name: value for name, value in new_params.items() if old_params.get(name) != value})
+    return result
+
+class ConfigWatcher:
+    """
+    Polls a config file's modification time on a background thread and calls `on_change(presets)`
+    (from load_presets) when it changes. Plugin loading happens in the callback, i.e. on this thread,
+    never on the audio thread. A config that fails to load is reported and the running chain stays.
+    Polling needs no extra dependency and an editor's save-by-rename is picked up like any write.
+    """
+    def __init__(self, path: str, on_change, interval: float = 0.5):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._mtime = self._read_mtime()
+        self._running = False
+        self._thread = None
+
+    def _read_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None # Missing for a moment while an editor replaces the file
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="config-watch")
+        self._thread.start()
+        print(f"👀 Watching {self.path} for changes")
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def check(self) -> bool:
+        """
+        Reloads once if the file changed since the last check. Returns True if it was reloaded.
+        """
+        mtime = self._read_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        print(f"\n🔄 {os.path.basename(self.path)} changed, reloading...")
+        try:
+            presets = load_presets(self.path)
+        except Exception as e: # pylint: disable=broad-except
+            # A half-typed config must not stop the pedalboard: report it and keep the running chain
+            print(f"❌ Could not load {self.path}: {type(e).__name__}: {e}")
+            return False
+        self.on_change(presets)
+        return True
+
+    def _loop(self):
+        while self._running:
+            time.sleep(self.interval)
+            self.check()
@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import json
+import os
+import pedalboard
+
+class PluginCache:
+    """
+    On-disk cache for external (VST3) plugins, one JSON file per plugin path.
+
+    Each entry stores the plugin's validated parameter set (name, range, valid values) and its
+    state blob (`raw_state`), keyed by the plugin file's mtime and the pedalboard version, so an
+    updated plugin never gets a stale state. The state restores everything the `params` dict
+    cannot express (loaded amp models, IRs, hidden settings); the config params are applied on top.
+    The state is only restored for the config params it was saved with: once they change (e.g. a
+    param is removed), the plugin starts from its defaults instead of the old cached values.
+    """
+    def __init__(self, cache_dir: str = ".plugin_cache"):
+        self.cache_dir = cache_dir
+
+    def _entry_path(self, path: str) -> str:
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(path)}-{digest}.json")
+
+    @staticmethod
+    def _version(path: str) -> list:
+        return [os.path.getmtime(path), pedalboard.__version__]
+
+    def get(self, path: str):
+        """
+        Returns the cached entry for a plugin file, or None if missing or out of date.
+        """
+        try:
+            with open(self._entry_path(path), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != self._version(path):
+            return None
+        return entry
+
+    @staticmethod
+    def _params_key(params: dict) -> str:
+        return json.dumps(params or {}, sort_keys=True, default=str)
+
+    def put(self, path: str, plugin, params: dict = None):
+        entry = {
+            "path": os.path.abspath(path),
+            "version": self._version(path),
+            "name": getattr(plugin, "name", os.path.basename(path)),
+            "parameters": self.describe_parameters(plugin),
+            "params": self._params_key(params), # Config params the state was saved with
+        }
+        try:
+            entry["raw_state"] = base64.b64encode(plugin.raw_state).decode("ascii")
+        except (AttributeError, RuntimeError, TypeError):
+            entry["raw_state"] = None
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._entry_path(path), "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=2)
+        except OSError as e:
+            print(f"   ⚠️ Could not write plugin cache for {os.path.basename(path)}: {e}")
+
+    def restore_state(self, path: str, plugin, params: dict = None) -> bool:
+        """
+        Applies the cached state blob to a freshly loaded plugin. Returns True on success.
+        A state saved with other config params is not restored (put() replaces it afterwards).
+        """
+        entry = self.get(path)
+        if not entry or not entry.get("raw_state"):
+            return False
+        if entry.get("params") != self._params_key(params):
+            return False
+        try:
+            plugin.raw_state = base64.b64decode(entry["raw_state"])
+            return True
+        except (AttributeError, RuntimeError, TypeError, ValueError) as e:
+            print(f"   ⚠️ Cached state rejected by {os.path.basename(path)}: {e}")
+            return False
+
+    def entries(self) -> list:
+        """
+        Every valid cached plugin (for --list-effects), without loading any plugin.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        found = []
+        for filename in sorted(os.listdir(self.cache_dir)):
+            try:
+                with open(os.path.join(self.cache_dir, filename), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            path = entry.get("path", "")
+            if os.path.exists(path) and entry.get("version") == self._version(path):
+                found.append(entry)
+        return found
+
+    @staticmethod
+    def describe_parameters(plugin) -> dict:
+        """
+        Parameter set of a plugin as {python name: {"min", "max", "valid_values", "units"}}.
+        """
+        described = {}
+        for name, parameter in getattr(plugin, "parameters", {}).items():
+            info = {}
+            for attribute in ("min_value", "max_value", "units"):
+                value = getattr(parameter, attribute, None)
+                if isinstance(value, (int, float, str)):
+                    info[attribute.replace("_value", "")] = value
+            valid_values = getattr(parameter, "valid_values", None)
+            if valid_values and len(valid_values) <= 64: # Only discrete choices, not sampled ranges
+                info["valid_values"] = [str(value) for value in valid_values]
+            described[name] = info
+        return described
@@ -0,0 +1,67 @@
+import numpy as np
+
+class RingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring buffer of audio frames.
+
+    The producer (usually the audio callback) only advances `write_index` and the consumer
+    (a background thread) only advances `read_index`. Both indices only ever grow, so each
+    side can read the other's index without a lock.
+    Writes that do not fit are rejected as a whole and counted instead of blocking.
+    """
+    def __init__(self, capacity: int, channels: int, dtype=np.float32):
+        self.capacity = capacity
+        self.channels = channels
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        self.write_index = 0
+        self.read_index = 0
+
+        # Overflow accounting (producer side)
+        self.overflow_count = 0
+        self.dropped_frames = 0
+
+    def available(self) -> int:
+        """Frames ready to be read."""
+        return self.write_index - self.read_index
+
+    def free(self) -> int:
+        """Frames that can be written without overflowing."""
+        return self.capacity - self.available()
+
+    def write(self, data) -> bool:
+        """
+        Copies a (frames, channels) block into the ring. Returns False (and counts the overflow)
+        if there is not enough room for the whole block.
+        """
+        frames = data.shape[0]
+        if frames > self.free():
+            self.overflow_count += 1
+            self.dropped_frames += frames
+            return False
+
+        start = self.write_index % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        if first < frames:
+            self.buffer[:frames - first] = data[first:]
+
+        # Publish only after the data is in place
+        self.write_index += frames
+        return True
+
+    def read(self, out) -> int:
+        """
+        Copies up to len(out) frames into `out` and returns how many frames were read.
+        """
+        frames = min(out.shape[0], self.available())
+        if frames == 0:
+            return 0
+
+        start = self.read_index % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        if first < frames:
+            out[first:frames] = self.buffer[:frames - first]
+
+        self.read_index += frames
+        return frames
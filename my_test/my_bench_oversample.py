@@ -0,0 +1,53 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.append(os.getcwd())
+
+import pedalboard
+from chain_compiler import ChainCompiler
+from mod_oversample import OversampledEffect
+
+def run(effect, signal, block_size, sample_rate):
+    out = np.zeros_like(signal)
+    start_time = time.perf_counter()
+    for start in range(0, signal.shape[0], block_size):
+        out[start:start + block_size] = effect(signal[start:start + block_size], sample_rate)
+    return out, time.perf_counter() - start_time
+
+def alias_level_db(out, tone_hz, sample_rate):
+    """Energy outside the harmonics of tone_hz, relative to the harmonics (dB)."""
+    spectrum = np.abs(np.fft.rfft(out * np.hanning(len(out)))) ** 2
+    freqs = np.fft.rfftfreq(len(out), 1 / sample_rate)
+    harmonics = np.zeros(len(freqs), dtype=bool)
+    for k in range(1, int(sample_rate / 2 / tone_hz) + 1):
+        harmonics |= np.abs(freqs - k * tone_hz) < 30
+    return 10 * np.log10(spectrum[~harmonics].sum() / spectrum[harmonics].sum())
+
+def bench_oversample():
+    print("Distortion (drive 30 dB) at 1x / 2x / 4x / 8x oversampling...")
+    sample_rate = 32000
+    block_size = 32
+    seconds = 2.0
+    tone_hz = 2900.0
+
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    tone = (0.8 * np.sin(2 * np.pi * tone_hz * t)).astype(np.float32)
+    signal = np.stack([tone, tone], axis=1)
+
+    baseline = ChainCompiler.compile([pedalboard.Distortion(drive_db=30.0)])
+    effects = [(1, lambda block, sr: baseline.process(block, sr), 0)]
+    for factor in OversampledEffect.FACTORS:
+        effect = OversampledEffect(pedalboard.Distortion(drive_db=30.0), factor)
+        effects.append((factor, effect, effect.latency_samples))
+
+    print(f"   {'factor':>6} {'realtime':>10} {'µs/block':>10} {'alias dB':>9} {'latency':>8}")
+    for factor, effect, latency in effects:
+        out, elapsed = run(effect, signal, block_size, sample_rate)
+        per_block_us = elapsed / (len(signal) / block_size) * 1e6
+        alias = alias_level_db(out[sample_rate // 4:, 0], tone_hz, sample_rate)
+        print(f"   {factor:>5}x {seconds / elapsed:>9.1f}x {per_block_us:>10.1f} {alias:>9.1f} {latency:>5.0f} smp")
+
+if __name__ == "__main__":
+    bench_oversample()
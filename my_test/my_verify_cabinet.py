@@ -0,0 +1,51 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+import fx_custom
+
+def render(cabinet, signal, block_size):
+    out = np.zeros_like(signal)
+    for start in range(0, signal.shape[0], block_size):
+        cabinet.process(signal[start:start + block_size], out[start:start + block_size])
+    return out
+
+def verify_cabinet():
+    """
+    Runs MyCabinet's in-place process() with blocks larger than the one given to prepare()
+    (what the engine does after --auto-tune / --adaptive raise the block size) and checks the
+    output matches the same signal processed at the prepared block size.
+    """
+    print("Comparing MyCabinet with oversized blocks against the prepared block size...")
+    sample_rate = 32000
+    rng = np.random.default_rng(0)
+    signal = (rng.standard_normal((sample_rate, 2)) * 0.3).astype(np.float32)
+
+    reference = fx_custom.MyCabinet()
+    reference.prepare(sample_rate, 32)
+    expected = render(reference, signal, 32)
+
+    failures = 0
+    for block_size in (256, 1024):
+        cabinet = fx_custom.MyCabinet()
+        cabinet.prepare(sample_rate, 32)
+        try:
+            output = render(cabinet, signal, block_size)
+        except ValueError as e:
+            print(f"❌ {block_size}-frame blocks: {e}")
+            failures += 1
+            continue
+        error = float(np.max(np.abs(output - expected)))
+        ok = error < 1e-5
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {block_size}-frame blocks: max error {error:.2e}")
+
+    if failures:
+        print(f"❌ FAILED: {failures} block size(s) did not match.")
+        sys.exit(1)
+    print("✅ PASSED: Oversized blocks match the prepared block size.")
+
+if __name__ == "__main__":
+    verify_cabinet()
@@ -0,0 +1,78 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.append(os.getcwd())
+
+import fx_custom
+
+class LegacyChorus:
+    """
+    The original per-sample MyChorus loop (nearest-sample read), kept here as a reference.
+    """
+    def __init__(self, depth_ms=2.0, speed_hz=2.0, mix=0.5):
+        self.depth_ms = depth_ms
+        self.speed_hz = speed_hz
+        self.mix = mix
+        self.buffer_size = int(48000 * 0.05)
+        self.buffer = np.zeros((self.buffer_size, 2))
+        self.write_ptr = 0
+        self.phase = 0.0
+
+    def __call__(self, input_array, sample_rate):
+        output_array = np.zeros_like(input_array)
+        for i in range(input_array.shape[0]):
+            self.buffer[self.write_ptr] = input_array[i]
+            lfo = np.sin(2 * np.pi * self.speed_hz * (self.phase / sample_rate))
+            delay_samples = (5.0 + (lfo * self.depth_ms)) * (sample_rate / 1000.0)
+            read_ptr = int(self.write_ptr - delay_samples) % self.buffer_size
+            output_array[i] = (input_array[i] * (1 - self.mix)) + (self.buffer[read_ptr] * self.mix)
+            self.write_ptr = (self.write_ptr + 1) % self.buffer_size
+            self.phase += 1
+        return output_array
+
+def run(effect, signal, block_size, sample_rate):
+    out = np.zeros_like(signal)
+    if hasattr(effect, "prepare"):
+        # Compiles the numba kernel (and resets the state) before the timer starts
+        effect.prepare(sample_rate, block_size)
+    start_time = time.perf_counter()
+    for start in range(0, signal.shape[0], block_size):
+        out[start:start + block_size] = effect(signal[start:start + block_size], sample_rate)
+    return out, time.perf_counter() - start_time
+
+def verify_chorus():
+    print("Comparing vectorized MyChorus against the legacy per-sample loop...")
+    sample_rate = 32000
+    block_size = 32
+    seconds = 2.0
+
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    mono = np.sin(2 * np.pi * 220 * t) * 0.5
+    signal = np.stack([mono, mono * 0.8], axis=1).astype(np.float32)
+
+    legacy_out, legacy_time = run(LegacyChorus(depth_ms=3.0, speed_hz=2.5, mix=0.5), signal, block_size, sample_rate)
+    new_out, new_time = run(fx_custom.MyChorus(depth_ms=3.0, speed_hz=2.5, mix=0.5, interpolation="none"),
+                            signal, block_size, sample_rate)
+
+    # The LFO phase is accumulated differently, so a read index may land one sample
+    # apart exactly where the delay crosses an integer. Everything else must match.
+    sample_err = np.max(np.abs(legacy_out - new_out), axis=1)
+    mismatches = np.count_nonzero(sample_err > 1e-6)
+    rms_err = np.sqrt(np.mean((legacy_out - new_out) ** 2))
+    print(f"Legacy: {legacy_time:.3f}s  Vectorized: {new_time:.3f}s  ({legacy_time / new_time:.1f}x faster)")
+    print(f"interpolation='none': {mismatches}/{len(sample_err)} samples differ, RMS error {rms_err:.2e}")
+
+    for mode in ("linear", "cubic"):
+        out, elapsed = run(fx_custom.MyChorus(depth_ms=3.0, speed_hz=2.5, mix=0.5, interpolation=mode),
+                           signal, block_size, sample_rate)
+        print(f"{mode:>6}: {elapsed:.3f}s, peak {np.max(np.abs(out)):.3f}")
+
+    if mismatches < len(sample_err) * 1e-3 and rms_err < 1e-3:
+        print("✅ PASSED: Output matches the nearest-sample reference.")
+    else:
+        print("❌ FAILED: Output differs from the nearest-sample reference.")
+
+if __name__ == "__main__":
+    verify_chorus()
@@ -0,0 +1,37 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+from audio_engine import PedalboardEngine
+from preset_bank import PresetBank
+
+def verify_latency():
+    """
+    Measures every preset against the software loopback (no audio device needed, e.g. CI):
+    the loopback must measure exactly the round trip the stream reports, and every chain
+    must add exactly the latency its effects declare (0 for plain pedalboard effects).
+    """
+    print("Measuring preset latency on the software loopback...")
+    bank = PresetBank()
+    failures = 0
+    for key in bank.presets:
+        engine = PedalboardEngine(preset_bank=bank, preset=key, loopback=True)
+        result = engine.measure_latency()
+        device = result["device"]
+        chain = result["chain"]
+        declared = sum(effect["declared_samples"] for effect in chain["effects"])
+        if abs(device["samples"] - device["reported_samples"]) > 0.5:
+            print(f"❌ {key}: loopback measured {device['samples']:.1f} samples, stream reports {device['reported_samples']:.1f}")
+            failures += 1
+        if abs(chain["samples"] - declared) > 0.5:
+            print(f"❌ {key}: chain adds {chain['samples']:.1f} samples, effects declare {declared:.1f}")
+            failures += 1
+
+    if failures:
+        print(f"❌ FAILED: {failures} latency mismatch(es).")
+        sys.exit(1)
+    print("✅ PASSED: Device and chain latency match the reported / declared values.")
+
+if __name__ == "__main__":
+    verify_latency()
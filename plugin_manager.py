@@ -1,74 +1,202 @@
+import inspect
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pedalboard
 from pedalboard import load_plugin
+import audio_config
 import fx_custom
+from chain_parallel import ParallelBlock, ParallelBranch
+from mod_oversample import OversampledEffect
+from mod_plugin_cache import PluginCache
 
 class PluginManager:
     """
     Responsible for loading plugins/effects from configuration.
     Implements a simple Factory Pattern to instantiate different types of effects.
     """
+    # name -> pedalboard class (or None), resolved once per name
+    _internal_classes = {}
+    # Parameter sets and state blobs of VST3 plugins (.plugin_cache/)
+    plugin_cache = PluginCache()
 
     @staticmethod
     def load_effect_chain(config: list) -> list:
         """
         Parses the configuration list and returns a list of instantiated effect objects.
         """
-        chain = []
         print("🔌 Loading effects chain...")
+        return [effect for effect in PluginManager.load_effects(config) if effect is not None]
 
-        for item in config:
-            try:
-                plugin_type = item.get("type")
-                name = item.get("name")
-                params = item.get("params", {})
-
-                if plugin_type == "internal":
-                    effect = PluginManager._load_internal(name, params)
-                elif plugin_type == "vst3":
-                    path = item.get("path")
-                    effect = PluginManager._load_vst3(path)
-                elif plugin_type == "custom":
-                    effect = PluginManager._load_custom(name, params)
-                else:
-                    print(f"   ⚠️ Unknown plugin type: {plugin_type} for {name}")
-                    continue
-
-                if effect:
-                    chain.append(effect)
-                    label = name if name else os.path.basename(item.get("path", "Unknown"))
-                    print(f"   ✅ Loaded {plugin_type.capitalize()}: {label}")
-
-            except (ImportError, AttributeError, TypeError) as e:
-                print(f"   ❌ Failed to load {item}: {e}")
-
-        return chain
+    @staticmethod
+    def load_effects(config: list) -> list:
+        """
+        Like load_effect_chain(), but returns one entry per config item, in order (None where the item
+        failed to load), so callers can tell which config item every effect came from.
+        """
+        # VST3s are the slow part: start them all at once, then pick them up in chain order
+        vst3_loads = PluginManager._start_vst3_loads(config)
+        return [PluginManager._load_item(item, vst3_loads.get(index)) for index, item in enumerate(config)]
 
     @staticmethod
-    def _load_internal(name: str, params: dict):
-        # Dynamically import pedalboard checks globals of where this is called?
-        # No, we need to import them here or assume they are available.
-        # Ideally, we explicitly import the supported classes to avoid arbitrary code execution,
-        # but for flexibility we can check the pedalboard module.
+    def _load_item(item: dict, pending=None):
+        try:
+            plugin_type = item.get("type")
+            name = item.get("name")
+            params = item.get("params", {})
 
-        # Check if the class exists in the pedalboard module
-        effect_class = getattr(pedalboard, name, None)
+            if plugin_type == "internal":
+                effect = PluginManager._load_internal(name, params)
+            elif plugin_type == "vst3":
+                path = item.get("path")
+                effect = PluginManager._load_vst3(path, params, pending)
+            elif plugin_type == "custom":
+                effect = PluginManager._load_custom(name, params)
+            elif plugin_type == "parallel":
+                effect = PluginManager._load_parallel(item.get("branches", []))
+                name = f"{len(effect.branches)} branches" if effect else name
+            else:
+                print(f"   ⚠️ Unknown plugin type: {plugin_type} for {name}")
+                return None
+
+            if not effect:
+                return None
+            label = name if name else os.path.basename(item.get("path", "Unknown"))
+            if item.get("oversample"):
+                # Only this stage runs at the higher rate
+                effect = OversampledEffect(effect, item["oversample"])
+                label += f" ({item['oversample']}x oversampled, +{effect.latency_samples:.0f} samples)"
+            print(f"   ✅ Loaded {plugin_type.capitalize()}: {label}")
+            return effect
+
+        except (ImportError, AttributeError, TypeError, ValueError) as e:
+            print(f"   ❌ Failed to load {item}: {e}")
+            return None
+
+    @staticmethod
+    def _internal_class(name: str):
+        """
+        Resolves (and caches) a pedalboard effect class by name.
+        Only real effect classes are accepted, not containers or arbitrary module attributes.
+        """
+        if name not in PluginManager._internal_classes:
+            effect_class = getattr(pedalboard, name, None)
+            is_effect = (inspect.isclass(effect_class) and issubclass(effect_class, pedalboard.Plugin)
+                         and effect_class is not pedalboard.Plugin
+                         and not issubclass(effect_class, (pedalboard.PluginContainer, pedalboard.ExternalPlugin)))
+            PluginManager._internal_classes[name] = effect_class if is_effect else None
+        return PluginManager._internal_classes[name]
+
+    @staticmethod
+    def _load_internal(name: str, params: dict):
+        effect_class = PluginManager._internal_class(name)
         if effect_class:
             return effect_class(**params)
         print(f"   ⚠️ Unknown internal effect class: {name}")
         return None
 
     @staticmethod
-    def _load_vst3(path: str):
-        if path and os.path.exists(path):
-            return load_plugin(path)
-        print(f"   ⚠️ VST3 not found: {path} (Skipping)")
-        return None
+    def _start_vst3_loads(config: list) -> dict:
+        """
+        Submits load_plugin for every VST3 entry of the chain to a thread pool.
+        Returns {chain index: Future}, so cold start takes about as long as the slowest plugin.
+        """
+        paths = {index: item.get("path") for index, item in enumerate(config)
+                 if item.get("type") == "vst3" and item.get("path") and os.path.exists(item.get("path"))}
+        if not paths:
+            return {}
+
+        pool = ThreadPoolExecutor(max_workers=len(paths), thread_name_prefix="vst3-load")
+        loads = {index: pool.submit(load_plugin, path) for index, path in paths.items()}
+        pool.shutdown(wait=False) # Submitted loads keep running; the pool goes away when they finish
+        return loads
+
+    @staticmethod
+    def _load_vst3(path: str, params: dict = None, pending=None):
+        if not (path and os.path.exists(path)):
+            print(f"   ⚠️ VST3 not found: {path} (Skipping)")
+            return None
+
+        try:
+            plugin = pending.result() if pending else load_plugin(path)
+        except (ImportError, RuntimeError) as e:
+            if pending is None:
+                raise
+            # Some plugins refuse to be created off the main thread: retry here
+            print(f"   ⚠️ Parallel load of {os.path.basename(path)} failed ({e}), retrying...")
+            plugin = load_plugin(path)
+
+        # Cached state first (hidden settings, loaded models), then the config params on top
+        PluginManager.plugin_cache.restore_state(path, plugin, params)
+        PluginManager._apply_params(plugin, params or {}, os.path.basename(path))
+        PluginManager.plugin_cache.put(path, plugin, params)
+        return plugin
+
+    @staticmethod
+    def _apply_params(plugin, params: dict, label: str):
+        """
+        Sets config params on an external plugin, checking them against its parameter set.
+        Unknown names and rejected values are reported and skipped instead of failing the load.
+        """
+        parameters = getattr(plugin, "parameters", {})
+        for name, value in params.items():
+            if name not in parameters:
+                print(f"   ⚠️ {label} has no parameter '{name}' (valid: {', '.join(sorted(parameters))})")
+                continue
+            try:
+                setattr(plugin, name, value)
+            except (ValueError, TypeError) as e:
+                print(f"   ⚠️ {label}: invalid value for '{name}': {e}")
 
     @staticmethod
     def _load_custom(name: str, params: dict):
         effect_class = getattr(fx_custom, name, None)
         if effect_class:
-            return effect_class(**params)
+            effect = effect_class(**params)
+            # Compile JIT kernels / size buffers now, not on the first audio callback
+            if hasattr(effect, "prepare"):
+                effect.prepare(audio_config.SAMPLE_RATE, audio_config.BLOCK_SIZE)
+            return effect
         print(f"   ⚠️ Unknown custom effect class in fx_custom: {name}")
         return None
+
+    @staticmethod
+    def _load_parallel(branches: list):
+        """
+        Builds a ParallelBlock. Each branch is {"chain": [...], "mix": 1.0, "pan": 0.0, "input": "both"},
+        where "chain" uses the same format as a top-level config (and may itself be empty for a dry path).
+        """
+        if not branches:
+            print("   ⚠️ Parallel block without branches (Skipping)")
+            return None
+
+        loaded = []
+        for branch in branches:
+            effects = PluginManager.load_effect_chain(branch.get("chain", []))
+            loaded.append(ParallelBranch(
+                effects,
+                mix=branch.get("mix", 1.0),
+                pan=branch.get("pan", 0.0),
+                source=branch.get("input", "both")
+            ))
+        return ParallelBlock(loaded)
+
+    @staticmethod
+    def list_effects() -> dict:
+        """
+        Available effects for --list-effects: {"internal": {name: signature}, "custom": {name: info},
+        "vst3": {path: cache entry}}. Custom effects come from the fx_custom manifest and VST3s from
+        the plugin cache, so no effect module or plugin is loaded.
+        """
+        internal = {}
+        for name in sorted(vars(pedalboard)):
+            effect_class = PluginManager._internal_class(name)
+            if effect_class is None:
+                continue
+            # pybind11 classes carry their signature in the first docstring line:
+            # "__init__(self: pedalboard_native.Gain, gain_db: float = 1.0) -> None"
+            doc = (effect_class.__init__.__doc__ or "").strip().splitlines()
+            first = doc[0] if doc else ""
+            params = first[first.find("(") + 1:first.rfind(")")].split(", ")
+            internal[name] = ", ".join(p for p in params if p and not p.startswith("self"))
+        vst3 = {entry["path"]: entry for entry in PluginManager.plugin_cache.entries()}
+        return {"internal": internal, "custom": fx_custom.list_effects(), "vst3": vst3}
@@ -0,0 +1,124 @@
+import threading
+import fx_config
+from chain_compiler import ChainCompiler
+from chain_optimizer import ChainOptimizer, rewritable
+from mod_config_watch import diff_chain
+from plugin_manager import PluginManager
+
+class PresetBank:
+    """
+    Cache of compiled preset chains for live switching.
+    Chains are built on first use (or all at once with preload()) on the calling thread,
+    never on the audio thread, and then reused on every later switch.
+    With optimize=True every chain goes through the ChainOptimizer before it is compiled.
+    """
+    def __init__(self, presets: dict = None, group_native: bool = True, optimize: bool = False):
+        # key -> (label, chain config); "default" is fx_config.PLUGIN_CHAIN_CONFIG
+        self.presets = {"default": ("Default", fx_config.PLUGIN_CHAIN_CONFIG)}
+        self.presets.update(presets if presets is not None else fx_config.PRESETS)
+        self.group_native = group_native
+        self.optimize = optimize
+        self._chains = {}
+        self._effects = {} # key -> one effect (or None if it failed to load) per config item
+        self._lock = threading.Lock() # get() runs on the command thread, reload() on the config watcher
+
+    def __contains__(self, key):
+        return key in self.presets
+
+    def label(self, key: str) -> str:
+        return self.presets[key][0]
+
+    def get(self, key: str):
+        """
+        Returns the CompiledChain for a preset, loading its plugins the first time.
+        """
+        with self._lock:
+            if key not in self._chains:
+                label, config = self.presets[key]
+                print(f"Loading Preset: {label}")
+                self._compile(key, PluginManager.load_effects(config))
+            return self._chains[key]
+
+    def _compile(self, key: str, effects: list):
+        self._effects[key] = effects
+        chain = [effect for effect in effects if effect is not None]
+        if self.optimize:
+            chain = ChainOptimizer.optimize(chain)
+        self._chains[key] = ChainCompiler.compile(chain, group_native=self.group_native, name=key)
+        return self._chains[key]
+
+    def loaded(self) -> list:
+        """
+        The chains built so far.
+        """
+        return list(self._chains.values())
+
+    def preload(self):
+        """
+        Instantiates every preset up front, so no switch ever waits for a plugin load.
+        """
+        for key in self.presets:
+            self.get(key)
+
+    def reload(self, presets: dict):
+        """
+        Applies edited preset configs (e.g. from a watched config file) to the loaded chains,
+        diffing every chain against its running config by position:
+          - an item with the same type, name and path keeps its effect; its changed params are
+            returned as (effect, param, value) for the engine's automation,
+          - new or replaced items (and params an effect lists in `rebuild_params`) are instantiated
+            here, on the calling thread, and the chain is recompiled around the kept effects.
+        Optimized chains may have dropped or fused the effect a param belongs to: there, changed
+        Gains, filters and pass-through candidates are loaded anew like replaced items and the chain
+        is recompiled (and optimized) again; all other effects still take the automation path.
+        Returns ({key: recompiled chain}, [changes]). Presets not loaded yet only take the new config.
+        """
+        rebuilt = {}
+        changes = []
+        with self._lock:
+            updated = {"default": self.presets["default"]}
+            updated.update(presets)
+            for key in list(self._chains):
+                if key not in updated:
+                    # Removed from the config: a chain that is still running keeps running until switched away
+                    del self._chains[key]
+                    del self._effects[key]
+                    continue
+                chain, key_changes = self._reload_chain(key, self.presets[key][1], updated[key][1])
+                if chain is not None:
+                    rebuilt[key] = chain
+                changes += key_changes
+            self.presets = updated
+        return rebuilt, changes
+
+    def _reload_chain(self, key: str, old_config: list, new_config: list):
+        old_effects = self._effects[key]
+        effects = [None] * len(new_config)
+        changes = []
+        to_load = []
+        for index, params in enumerate(diff_chain(old_config, new_config)):
+            effect = old_effects[index] if params is not None else None
+            target = getattr(effect, "effect", effect) # Oversampled effects: params belong to the wrapped effect
+            if effect is not None and params and self.optimize and rewritable(effect):
+                effect = None # The optimizer may have dropped or fused it: build a new instance and re-optimize
+            elif effect is not None and any(name in getattr(type(target), "rebuild_params", ()) or not hasattr(target, name)
+                                            for name in params):
+                effect = None # The param is only read by the constructor: build a new instance
+            if effect is None:
+                to_load.append(index)
+                continue
+            effects[index] = effect
+            changes += [(target, name, value) for name, value in params.items()]
+
+        if to_load:
+            for index, effect in zip(to_load, PluginManager.load_effects([new_config[i] for i in to_load])):
+                effects[index] = effect
+
+        kept = [effect for effect in effects if effect is not None]
+        if changes or to_load or len(new_config) != len(old_config):
+            print(f"🔁 Preset {self.presets[key][0]}: {len(changes)} param(s) updated, {len(to_load)} effect(s) loaded")
+        if [id(effect) for effect in kept] == [id(effect) for effect in old_effects if effect is not None]:
+            # Same effect objects in the same order: params are updated in place, no new chain needed
+            self._effects[key] = effects
+            return None, changes
+        return self._compile(key, effects), changes